@@ -0,0 +1,173 @@
+"""Headless frame-rate benchmarks for every level and the heavy boss/finale phases.
+
+Each scenario is measured three ways: ``update`` (game logic only), ``draw``
+(background, level and HUD rendering only) and ``full`` (both). Every case
+is run several times, each for at least a minimum wall time, and the median
+frames per second is compared with ``baseline.json``. A case that drops
+below its baseline by more than the threshold, or by more than its own
+repeats spread if that is wider, is reported as a regression and the
+script exits non-zero.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --only boss --frames 300
+    python benchmarks/run_benchmarks.py --update-baseline
+"""
+import argparse
+import fnmatch
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import platformer  # noqa: E402
+from platformer import FPS, Game, load_levels  # noqa: E402
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+MODES = ("update", "draw", "full")
+SEED = 1234
+
+
+def prepare_level(index):
+    def prepare(game):
+        game.start_level(index)
+
+    return prepare
+
+
+def prepare_boss_attacks(game):
+    game.start_level(game.boss_level_index)
+
+
+def boss_attacks_frame(game, frame):
+    # Reset every attack cooldown periodically so each Boss.update pattern
+    # (aimed shot, beams, rain, volley, pulse) keeps firing during the run.
+    boss = game.levels[game.level_index].boss
+    if boss and frame % 20 == 0:
+        boss.shot_cooldown = boss.beam_cooldown = boss.rain_cooldown = 0
+        boss.volley_cooldown = boss.pulse_cooldown = 0
+
+
+def prepare_fire_background(game):
+    game.start_level(len(game.levels) - 1)
+    game.fire_mode = True
+
+
+def fire_background_frame(game, frame):
+    game.update_finale_fx(frame * 1000 // FPS)
+
+
+def prepare_encore_wave(game):
+    game.start_level(game.boss_level_index)
+    level = game.levels[game.level_index]
+    game.trigger_finale(level)
+    # Skip the one-minute celebration so the first update spawns the wave.
+    game.finale_start_time = game.ticks() - 62000
+    game.step_simulation()
+
+
+def scenarios():
+    """Return (name, prepare, per_frame) for every level plus the stress phases."""
+    found = [(f"level{index + 1:02d}", prepare_level(index), None) for index in range(len(load_levels()))]
+    found.append(("boss_attacks", prepare_boss_attacks, boss_attacks_frame))
+    found.append(("fire_background", prepare_fire_background, fire_background_frame))
+    found.append(("encore_wave", prepare_encore_wave, None))
+    return found
+
+
+def run_frames(game, mode, frames, per_frame, first=0):
+    level = None
+    for frame in range(first, first + frames):
+        if per_frame:
+            per_frame(game, frame)
+        if mode != "draw":
+            game.step_simulation()
+        if mode != "update":
+            level = game.levels[game.level_index]
+            game.draw_background()
+            game.draw_level(level)
+            game.draw_hud(level)
+
+
+def measure(prepare, per_frame, mode, frames, warmup, min_time):
+    game = Game(headless=True, seed=SEED)
+    # God mode keeps the idle player alive so deaths don't turn a run into
+    # a level-reload benchmark.
+    game.god_mode = True
+    prepare(game)
+    run_frames(game, mode, warmup, per_frame)
+    done = 0
+    start = time.perf_counter()
+    # Short runs are dominated by timer and scheduler noise, so fast cases
+    # keep going in further batches until min_time has passed.
+    while True:
+        run_frames(game, mode, frames, per_frame, warmup + done)
+        done += frames
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return done / elapsed
+
+
+def measure_repeats(prepare, per_frame, mode, args):
+    """Median frames per second over args.repeats fresh runs, and their spread relative to it."""
+    samples = [measure(prepare, per_frame, mode, args.frames, args.warmup, args.min_time) for _ in range(args.repeats)]
+    median = statistics.median(samples)
+    return median, (max(samples) - min(samples)) / median
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=600, help="measured frames per scenario and mode")
+    parser.add_argument("--warmup", type=int, default=60, help="unmeasured frames before timing starts")
+    parser.add_argument("--repeats", type=int, default=5, help="runs per scenario and mode; the median is reported")
+    parser.add_argument(
+        "--min-time", type=float, default=1.0, help="minimum timed seconds per run; fast cases run extra frames"
+    )
+    parser.add_argument("--only", help="glob of scenario names to run, e.g. 'level0*' or 'boss*'")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed fractional slowdown versus baseline, widened to a case's repeat spread (default 0.25)",
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    results = {}
+    regressions = []
+    print(f"{'benchmark':<28}{'fps':>10}{'spread':>8}{'baseline':>10}{'change':>9}")
+    for name, prepare, per_frame in scenarios():
+        if args.only and not fnmatch.fnmatch(name, args.only):
+            continue
+        for mode in MODES:
+            key = f"{name}/{mode}"
+            fps, spread = measure_repeats(prepare, per_frame, mode, args)
+            results[key] = round(fps, 1)
+            reference = baseline.get(key)
+            if reference:
+                change = fps / reference - 1
+                flag = "  REGRESSION" if change < -max(args.threshold, spread) else ""
+                if flag:
+                    regressions.append(key)
+                print(f"{key:<28}{fps:10.0f}{spread:8.0%}{reference:10.0f}{change:+9.0%}{flag}")
+            else:
+                print(f"{key:<28}{fps:10.0f}{spread:8.0%}{'-':>10}{'-':>9}")
+
+    if args.update_baseline:
+        baseline.update(results)
+        BASELINE_PATH.write_text(json.dumps(dict(sorted(baseline.items())), indent=2) + "\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than baseline by more than the threshold:")
+        for key in regressions:
+            print(f"  {key}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,42 @@
+import argparse
+import atexit
+import csv
+import hashlib
+import io
+import itertools
+import json
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import mmap
+import os
+import struct
 import sys
+import threading
+import time
 from pathlib import Path
 import random
 import math
 import array
+from collections import OrderedDict, deque
 
+import numpy as np
 import pygame
 from pygame import Rect, Surface
 from pygame.math import Vector2
 
 # Game constants
 WIDTH, HEIGHT = 960, 640
-FPS = 60
+FPS = 60  # simulation ticks per second; all speeds and timers are per tick
+TICK_MS = 1000 / FPS
+MAX_FRAME_MS = 250  # longest real frame fed to the simulation
+MAX_CATCH_UP_TICKS = 5  # ticks run per rendered frame before falling behind
+MENU_BACKDROP_MS = 100  # how often idle menus repaint the drifting nebulae
 TILE = 48
 GRAVITY = 0.9
 JUMP_FORCE = -18
 PLAYER_SPEED = 6
 PROJECTILE_SPEED = 11
+CELEBRATION_PRELOAD_HP = 12  # boss health at which the finale track starts loading
 
 def load_levels():
     """Return 11 handcrafted level layouts using text maps."""
@@ -139,51 +160,480 @@ def load_levels():
         ],
     ]
 
-def draw_gradient_rect(surface: Surface, color_start, color_end, rect: Rect):
-    """Draw a vertical gradient for subtle background depth."""
-    steps = rect.height
-    for i in range(steps):
-        ratio = i / steps
-        r = color_start[0] + (color_end[0] - color_start[0]) * ratio
-        g = color_start[1] + (color_end[1] - color_start[1]) * ratio
-        b = color_start[2] + (color_end[2] - color_start[2]) * ratio
-        pygame.draw.line(surface, (int(r), int(g), int(b)), (rect.x, rect.y + i), (rect.x + rect.width, rect.y + i))
+class _ProfileSection:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        times = self.profiler.frame_times
+        times[self.name] = times.get(self.name, 0.0) + time.perf_counter() - self.start
+
+
+class _NullSection:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+class FrameProfiler:
+    """Per-frame section timings and counters kept over a rolling window of frames.
+
+    Sections are timed with ``with profiler.section(name)`` and accumulate
+    within a frame; counters (blits, Surface allocations) are bumped with
+    ``count``. ``end_frame`` moves the frame's totals into the rolling window.
+    """
+
+    def __init__(self, window=300):
+        self.window = window
+        self.enabled = False
+        self.frame_times = {}
+        self.frame_counts = {}
+        self.times = {}
+        self.counts = {}
+        self.sections = {}
+        self.null_section = _NullSection()
+
+    def section(self, name):
+        if not self.enabled:
+            return self.null_section
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = _ProfileSection(self, name)
+        return section
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.frame_counts[name] = self.frame_counts.get(name, 0) + amount
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        for samples, frame in ((self.times, self.frame_times), (self.counts, self.frame_counts)):
+            for name, value in frame.items():
+                if name not in samples:
+                    samples[name] = deque(maxlen=self.window)
+                samples[name].append(value)
+            frame.clear()
+
+    def reset(self):
+        self.frame_times.clear()
+        self.frame_counts.clear()
+        self.times.clear()
+        self.counts.clear()
+
+    @staticmethod
+    def percentile(ordered, pct):
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+    def summary(self):
+        """Rows of (kind, name, samples, mean, p50, p95, p99, max); times are in milliseconds."""
+        rows = []
+        for kind, samples, scale in (("time_ms", self.times, 1000.0), ("count", self.counts, 1)):
+            for name in sorted(samples):
+                ordered = sorted(value * scale for value in samples[name])
+                rows.append(
+                    (
+                        kind,
+                        name,
+                        len(ordered),
+                        sum(ordered) / len(ordered),
+                        self.percentile(ordered, 50),
+                        self.percentile(ordered, 95),
+                        self.percentile(ordered, 99),
+                        ordered[-1],
+                    )
+                )
+        return rows
+
+    def dump(self, path):
+        """Write the summary as JSON when the path ends in .json, CSV otherwise."""
+        fields = ("kind", "name", "samples", "mean", "p50", "p95", "p99", "max")
+        rows = self.summary()
+        path = Path(path)
+        if path.suffix.lower() == ".json":
+            path.write_text(json.dumps([dict(zip(fields, row)) for row in rows], indent=2))
+        else:
+            with path.open("w", newline="") as handle:
+                writer = csv.writer(handle)
+                writer.writerow(fields)
+                writer.writerows(rows)
+
+
+profiler = FrameProfiler()
+
+
+class StartupTrace:
+    """Wall-clock time of each startup phase, printed as it finishes when enabled."""
+
+    def __init__(self):
+        self.enabled = False
+        self.origin = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def write(self, line):
+        # The loader thread reports too, so each line goes out whole under the lock.
+        with self.lock:
+            sys.stdout.write(line + "\n")
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        yield
+        if self.enabled:
+            self.write(f"startup {name:<20}{(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    def mark(self, name):
+        if self.enabled:
+            self.write(f"startup {name:<20}{(time.perf_counter() - self.origin) * 1000:8.1f} ms since import")
+
+
+startup_trace = StartupTrace()
+
+_gradient_cache = {}
+
+def get_gradient_surface(color_start, color_end, size, alpha=None):
+    """Return a cached vertical gradient surface, rendering it on first request.
+
+    The gradient is computed once into a one-pixel-wide strip and stretched
+    to the requested width, so a full-screen sky costs one blit per frame.
+    """
+    key = (tuple(color_start), tuple(color_end), tuple(size), alpha)
+    surface = _gradient_cache.get(key)
+    if surface is None:
+        width, height = size
+        strip = Surface((1, height))
+        profiler.count("surface_allocs", 2)
+        for i in range(height):
+            ratio = i / height
+            r = color_start[0] + (color_end[0] - color_start[0]) * ratio
+            g = color_start[1] + (color_end[1] - color_start[1]) * ratio
+            b = color_start[2] + (color_end[2] - color_start[2]) * ratio
+            strip.set_at((0, i), (int(r), int(g), int(b)))
+        surface = pygame.transform.scale(strip, (width, height))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        if alpha is not None:
+            surface.set_alpha(alpha)
+        _gradient_cache[key] = surface
+    return surface
+
+def merge_rects(rects):
+    """Union overlapping rects until none overlap; used to build dirty-rect lists."""
+    merged = []
+    for rect in rects:
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect = rect.union(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+class GlowCache:
+    """LRU cache of pre-rendered circular glow sprites shared by all effects.
+
+    A glow is an outer disc plus an optional core disc or ring. Alphas are
+    snapped to buckets so slowly flickering particles reuse the same surface.
+    """
+
+    def __init__(self, capacity=384, alpha_step=8):
+        self.capacity = capacity
+        self.alpha_step = alpha_step
+        self.surfaces = OrderedDict()
+
+    def bucket(self, alpha):
+        step = self.alpha_step
+        return max(0, min(255, int(round(alpha / step)) * step))
+
+    def get(self, radius, color, alpha, core_color=None, core_radius=0, core_alpha=None, core_width=0):
+        """Return a (2 * radius)-square glow surface centred on (radius, radius)."""
+        radius = max(1, int(radius))
+        alpha = self.bucket(alpha)
+        core_alpha = alpha if core_alpha is None else self.bucket(core_alpha)
+        key = (radius, tuple(color[:3]), alpha, core_color, int(core_radius), core_alpha, core_width)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        surface = Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        profiler.count("surface_allocs")
+        pygame.draw.circle(surface, (*color[:3], alpha), (radius, radius), radius)
+        if core_color is not None and core_radius > 0:
+            pygame.draw.circle(surface, (*core_color, core_alpha), (radius, radius), int(core_radius), core_width)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (font, text, colour)."""
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+
+    def get(self, font, text, color):
+        key = (font, text, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        surface = font.render(text, True, color)
+        profiler.count("surface_allocs")
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+
+class ParticleSystem:
+    """Fixed-capacity particle pool stored as parallel NumPy buffers.
+
+    Live particles occupy the first ``count`` slots of every buffer; dead ones
+    are swap-removed so the live range stays contiguous for batched updates.
+    """
+
+    FIELDS = ("pos", "vel", "life", "size", "alpha", "color", "phase")
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.count = 0
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.life = np.zeros(capacity)
+        self.size = np.zeros(capacity)
+        self.alpha = np.zeros(capacity)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.phase = np.zeros(capacity)
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, pos, vel=(0, 0), life=0, size=0, alpha=255, color=(255, 255, 255), phase=0):
+        """Claim the next free slot; returns False when the pool is full."""
+        if self.count >= self.capacity:
+            return False
+        i = self.count
+        self.pos[i] = (pos[0], pos[1])
+        self.vel[i] = (vel[0], vel[1])
+        self.life[i] = life
+        self.size[i] = size
+        self.alpha[i] = alpha
+        self.color[i] = color
+        self.phase[i] = phase
+        self.count += 1
+        return True
+
+    def clear(self):
+        self.count = 0
+
+    def step(self):
+        n = self.count
+        self.pos[:n] += self.vel[:n]
+
+    def age(self, amount=1):
+        """Count down every particle's life and drop the ones that expire."""
+        n = self.count
+        self.life[:n] -= amount
+        self.remove(np.flatnonzero(self.life[:n] <= 0))
+
+    def remove(self, indices):
+        """Swap-remove live slots, refilling the holes from the tail of the range."""
+        if len(indices) == 0:
+            return
+        n = self.count
+        new_count = n - len(indices)
+        dead = np.zeros(n, dtype=bool)
+        dead[indices] = True
+        holes = np.flatnonzero(dead[:new_count])
+        fillers = np.flatnonzero(~dead[new_count:]) + new_count
+        for name in self.FIELDS:
+            buffer = getattr(self, name)
+            buffer[holes] = buffer[fillers]
+        self.count = new_count
+
+class ImageRegistry:
+    """Images shared by every instance of a sprite class, rendered on first use and converted once a display exists."""
+
+    def __init__(self):
+        self.images = {}
+        self.converted = set()
+
+    def get(self, key, render):
+        image = self.images.get(key)
+        if image is None:
+            image = self.images[key] = render()
+            profiler.count("surface_allocs")
+        if key not in self.converted and pygame.display.get_surface() is not None:
+            image = image.convert_alpha() if image.get_flags() & pygame.SRCALPHA else image.convert()
+            self.images[key] = image
+            self.converted.add(key)
+        return image
+
+
+sprite_images = ImageRegistry()
+
+SOUND_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "casino-platformer" / "sounds"
+
+# Procedural sound effects, keyed by the Game attribute they are stored on.
+# Each voice is (frequency Hz, relative weight, waveform).
+SOUND_EFFECTS = {
+    "shoot_sound": {"voices": ((520, 1.0, "sine"),), "duration_ms": 120, "volume": 0.28},
+    "enemy_shoot_sound": {"voices": ((300, 1.0, "sine"),), "duration_ms": 140, "volume": 0.22},
+    "boss_volley_sound": {"voices": ((140, 1.0, "sine"), (70, 0.4, "triangle")), "duration_ms": 200, "volume": 0.35},
+    "pickup_sound": {"voices": ((760, 1.0, "sine"), (1140, 0.35, "sine")), "duration_ms": 120, "volume": 0.3},
+}
+
+# How each effect is mixed: the most copies that may sound at once, and
+# whether it may use the channels held back for priority cues.
+SOUND_MIX = {
+    "shoot_sound": {"max_voices": 2, "priority": True},
+    "pickup_sound": {"max_voices": 2, "priority": True},
+    "enemy_shoot_sound": {"max_voices": 3},
+    "boss_volley_sound": {"max_voices": 2},
+}
+
+class Synth:
+    """Builds short procedural sound effects as 16-bit PCM with NumPy, cached on disk by their parameters."""
+
+    VERSION = 1
+    WAVEFORMS = {
+        "sine": lambda phase: np.sin(2 * np.pi * phase),
+        "square": lambda phase: np.where(phase % 1.0 < 0.5, 1.0, -1.0),
+        "triangle": lambda phase: 4 * np.abs(phase % 1.0 - 0.5) - 1,
+        "saw": lambda phase: 2 * (phase % 1.0) - 1,
+    }
+
+    def __init__(self, sample_rate=44100, channels=2, cache_dir=SOUND_CACHE_DIR):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+    def render(self, voices, duration_ms=160, volume=0.35, attack_ms=4, release_ms=30):
+        """Return interleaved int16 PCM for the mixed voices."""
+        length = int(self.sample_rate * duration_ms / 1000)
+        t = np.arange(length) / self.sample_rate
+        wave = np.zeros(length)
+        total = sum(weight for _, weight, _ in voices) or 1.0
+        for freq, weight, waveform in voices:
+            wave += self.WAVEFORMS[waveform](freq * t) * (weight / total)
+        envelope = np.ones(length)
+        attack = min(length, int(self.sample_rate * attack_ms / 1000))
+        release = min(length - attack, int(self.sample_rate * release_ms / 1000))
+        if attack:
+            envelope[:attack] = np.linspace(0.0, 1.0, attack, endpoint=False)
+        if release:
+            envelope[length - release :] = np.linspace(1.0, 0.0, release)
+        samples = (wave * envelope * volume * 32767).astype("<i2")
+        return np.repeat(samples, self.channels).tobytes()
+
+    def cache_path(self, params):
+        key = repr((self.VERSION, self.sample_rate, self.channels, sorted(params.items())))
+        return self.cache_dir / f"{hashlib.sha1(key.encode()).hexdigest()}.pcm"
+
+    def get(self, params):
+        """PCM for one SOUND_EFFECTS entry, from the disk cache when possible."""
+        if self.cache_dir is None:
+            return self.render(**params)
+        path = self.cache_path(params)
+        try:
+            return path.read_bytes()
+        except OSError:
+            pass
+        pcm = self.render(**params)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp = path.with_suffix(f".{os.getpid()}.tmp")
+            temp.write_bytes(pcm)
+            os.replace(temp, path)
+        except OSError:
+            pass  # a read-only home only costs a re-render next launch
+        return pcm
+
+    def build(self, effects):
+        return {name: self.get(params) for name, params in effects.items()}
+
 
 class Tile(pygame.sprite.Sprite):
-    def __init__(self, pos):
-        super().__init__()
-        self.image = Surface((TILE, TILE))
+    @staticmethod
+    def render_image():
+        image = Surface((TILE, TILE))
         base = (94, 76, 56)
         highlight = (150, 125, 92)
-        self.image.fill(base)
-        pygame.draw.rect(self.image, highlight, self.image.get_rect(), 3, border_radius=6)
-        pygame.draw.rect(self.image, (60, 45, 30), self.image.get_rect(), 1, border_radius=6)
+        image.fill(base)
+        pygame.draw.rect(image, highlight, image.get_rect(), 3, border_radius=6)
+        pygame.draw.rect(image, (60, 45, 30), image.get_rect(), 1, border_radius=6)
+        return image
+
+    def __init__(self, pos):
+        super().__init__()
+        self.image = sprite_images.get(Tile, Tile.render_image)
         self.rect = self.image.get_rect(topleft=pos)
 
 class Spike(pygame.sprite.Sprite):
+    @staticmethod
+    def render_image():
+        image = Surface((TILE, TILE), pygame.SRCALPHA)
+        points = [(6, TILE), (TILE / 2, 6), (TILE - 6, TILE)]
+        pygame.draw.polygon(image, (220, 80, 70), points)
+        pygame.draw.polygon(image, (255, 180, 160), points, 3)
+        return image
+
     def __init__(self, pos):
         super().__init__()
-        self.image = Surface((TILE, TILE), pygame.SRCALPHA)
-        points = [(6, TILE), (TILE / 2, 6), (TILE - 6, TILE)]
-        pygame.draw.polygon(self.image, (220, 80, 70), points)
-        pygame.draw.polygon(self.image, (255, 180, 160), points, 3)
+        self.image = sprite_images.get(Spike, Spike.render_image)
         self.rect = self.image.get_rect(topleft=pos)
 
 class Booster(pygame.sprite.Sprite):
+    @staticmethod
+    def render_image():
+        image = Surface((TILE, TILE))
+        image.fill((40, 120, 255))
+        pygame.draw.rect(image, (180, 225, 255), image.get_rect(), 3, border_radius=10)
+        pygame.draw.circle(image, (255, 255, 255), (TILE // 2, TILE // 2), TILE // 5)
+        return image
+
     def __init__(self, pos):
         super().__init__()
-        self.image = Surface((TILE, TILE))
-        self.image.fill((40, 120, 255))
-        pygame.draw.rect(self.image, (180, 225, 255), self.image.get_rect(), 3, border_radius=10)
-        pygame.draw.circle(self.image, (255, 255, 255), (TILE // 2, TILE // 2), TILE // 5)
+        self.image = sprite_images.get(Booster, Booster.render_image)
         self.rect = self.image.get_rect(topleft=pos)
 
-class MovingPlatform(pygame.sprite.Sprite):
+class StatefulSprite(pygame.sprite.Sprite):
+    """Sprite whose mutable fields (listed in state_fields) can be captured and restored."""
+
+    state_fields = ()
+
+    @staticmethod
+    def copy_value(value):
+        return value.copy() if isinstance(value, (Rect, Vector2)) else value
+
+    def get_state(self):
+        return tuple(self.copy_value(getattr(self, name)) for name in self.state_fields)
+
+    def set_state(self, state):
+        for name, value in zip(self.state_fields, state):
+            setattr(self, name, self.copy_value(value))
+
+class MovingPlatform(StatefulSprite):
+    state_fields = ("rect", "direction")
+
+    @staticmethod
+    def render_image():
+        image = Surface((TILE, TILE // 2))
+        image.fill((120, 190, 230))
+        pygame.draw.rect(image, (40, 80, 140), image.get_rect(), 3, border_radius=8)
+        return image
+
     def __init__(self, pos, axis="x", distance=TILE * 2, speed=2.4):
         super().__init__()
-        self.image = Surface((TILE, TILE // 2))
-        self.image.fill((120, 190, 230))
-        pygame.draw.rect(self.image, (40, 80, 140), self.image.get_rect(), 3, border_radius=8)
+        self.image = sprite_images.get(MovingPlatform, MovingPlatform.render_image)
         self.rect = self.image.get_rect(topleft=(pos[0], pos[1] + TILE // 2))
         self.start_pos = Vector2(self.rect.topleft)
         self.axis = axis
@@ -202,93 +652,122 @@ class MovingPlatform(pygame.sprite.Sprite):
                 self.direction *= -1
 
 class Collectible(pygame.sprite.Sprite):
+    @staticmethod
+    def render_image():
+        image = Surface((TILE // 2, TILE // 2), pygame.SRCALPHA)
+        pygame.draw.circle(image, (255, 215, 0), (TILE // 4, TILE // 4), TILE // 4)
+        pygame.draw.circle(image, (255, 255, 240), (TILE // 6, TILE // 6), TILE // 8)
+        return image
+
     def __init__(self, pos):
         super().__init__()
-        self.image = Surface((TILE // 2, TILE // 2), pygame.SRCALPHA)
-        pygame.draw.circle(self.image, (255, 215, 0), (TILE // 4, TILE // 4), TILE // 4)
-        pygame.draw.circle(self.image, (255, 255, 240), (TILE // 6, TILE // 6), TILE // 8)
+        self.image = sprite_images.get(Collectible, Collectible.render_image)
         self.rect = self.image.get_rect(center=(pos[0] + TILE // 2, pos[1] + TILE // 2))
 
 class ShieldPickup(pygame.sprite.Sprite):
+    @staticmethod
+    def render_image():
+        image = Surface((TILE, TILE), pygame.SRCALPHA)
+        glow_rect = image.get_rect()
+        pygame.draw.rect(image, (70, 220, 255, 120), glow_rect, border_radius=10)
+        pygame.draw.rect(image, (150, 240, 255, 180), glow_rect.inflate(-10, -10), border_radius=10)
+        pygame.draw.circle(image, (255, 255, 255, 220), glow_rect.center, TILE // 5)
+        return image
+
     def __init__(self, pos):
         super().__init__()
-        self.image = Surface((TILE, TILE), pygame.SRCALPHA)
-        glow_rect = self.image.get_rect()
-        pygame.draw.rect(self.image, (70, 220, 255, 120), glow_rect, border_radius=10)
-        pygame.draw.rect(self.image, (150, 240, 255, 180), glow_rect.inflate(-10, -10), border_radius=10)
-        pygame.draw.circle(self.image, (255, 255, 255, 220), glow_rect.center, TILE // 5)
+        self.image = sprite_images.get(ShieldPickup, ShieldPickup.render_image)
         self.rect = self.image.get_rect(topleft=pos)
 
-class LaserBarrier(pygame.sprite.Sprite):
-    def __init__(self, pos, axis="x"):
-        super().__init__()
+class LaserBarrier(StatefulSprite):
+    state_fields = ("timer", "active")
+
+    @staticmethod
+    def render_image(axis, active):
         size = (TILE, TILE // 3) if axis == "x" else (TILE // 3, TILE)
-        self.image = Surface(size, pygame.SRCALPHA)
-        self.rect = self.image.get_rect(topleft=pos)
+        image = Surface(size, pygame.SRCALPHA)
+        if axis == "x":
+            beam = Rect(0, size[1] // 2 - 5, size[0], 10)
+        else:
+            beam = Rect(size[0] // 2 - 5, 0, 10, size[1])
+        pygame.draw.rect(image, (255, 80, 40, 220 if active else 70), beam, border_radius=6)
+        return image
+
+    def __init__(self, pos, axis="x", rng=random):
+        super().__init__()
         self.axis = axis
-        self.timer = random.randint(0, 90)
+        self.timer = rng.randint(0, 90)
         self.active = True
+        self.image = self.beam_image()
+        self.rect = self.image.get_rect(topleft=pos)
+
+    def beam_image(self):
+        axis, active = self.axis, self.active
+        return sprite_images.get((LaserBarrier, axis, active), lambda: LaserBarrier.render_image(axis, active))
 
     def update(self):
         self.timer = (self.timer + 1) % 140
         self.active = self.timer < 90
-        alpha = 220 if self.active else 70
-        self.image.fill((0, 0, 0, 0))
-        if self.axis == "x":
-            pygame.draw.rect(
-                self.image,
-                (255, 80, 40, alpha),
-                Rect(0, self.image.get_height() // 2 - 5, self.image.get_width(), 10),
-                border_radius=6,
-            )
-        else:
-            pygame.draw.rect(
-                self.image,
-                (255, 80, 40, alpha),
-                Rect(self.image.get_width() // 2 - 5, 0, 10, self.image.get_height()),
-                border_radius=6,
-            )
+        self.image = self.beam_image()
 
 class Goal(pygame.sprite.Sprite):
+    @staticmethod
+    def render_image():
+        image = Surface((TILE, TILE))
+        image.fill((80, 200, 120))
+        pygame.draw.rect(image, (240, 255, 240), image.get_rect(), 4, border_radius=6)
+        return image
+
     def __init__(self, pos):
         super().__init__()
-        self.image = Surface((TILE, TILE))
-        self.image.fill((80, 200, 120))
-        pygame.draw.rect(self.image, (240, 255, 240), self.image.get_rect(), 4, border_radius=6)
+        self.image = sprite_images.get(Goal, Goal.render_image)
         self.rect = self.image.get_rect(topleft=pos)
 
 
 class Teleporter(pygame.sprite.Sprite):
+    @staticmethod
+    def render_image():
+        image = Surface((TILE, TILE), pygame.SRCALPHA)
+        glow_rect = image.get_rect()
+        pygame.draw.rect(image, (120, 255, 180, 90), glow_rect, border_radius=10)
+        pygame.draw.rect(image, (120, 255, 200, 150), glow_rect.inflate(-10, -10), border_radius=10)
+        pygame.draw.rect(image, (60, 200, 120, 220), glow_rect.inflate(-18, -18), border_radius=10)
+        return image
+
     def __init__(self, pos):
         super().__init__()
-        self.image = Surface((TILE, TILE), pygame.SRCALPHA)
-        glow_rect = self.image.get_rect()
-        pygame.draw.rect(self.image, (120, 255, 180, 90), glow_rect, border_radius=10)
-        pygame.draw.rect(self.image, (120, 255, 200, 150), glow_rect.inflate(-10, -10), border_radius=10)
-        pygame.draw.rect(self.image, (60, 200, 120, 220), glow_rect.inflate(-18, -18), border_radius=10)
+        self.image = sprite_images.get(Teleporter, Teleporter.render_image)
         self.rect = self.image.get_rect(topleft=pos)
 
-class Enemy(pygame.sprite.Sprite):
-    def __init__(self, pos):
+class Enemy(StatefulSprite):
+    state_fields = ("rect", "direction", "pace_timer")
+
+    @staticmethod
+    def render_image():
+        image = Surface((TILE, TILE))
+        image.fill((210, 80, 90))
+        pygame.draw.rect(image, (255, 200, 210), image.get_rect(), 3, border_radius=8)
+        return image
+
+    def __init__(self, pos, rng=random):
         super().__init__()
-        self.image = Surface((TILE, TILE))
-        self.image.fill((210, 80, 90))
-        pygame.draw.rect(self.image, (255, 200, 210), self.image.get_rect(), 3, border_radius=8)
+        self.rng = rng
+        self.image = sprite_images.get(Enemy, Enemy.render_image)
         self.rect = self.image.get_rect(topleft=pos)
         self.speed = 2.6
         self.direction = 1
-        self.pace_timer = random.randint(50, 110)
+        self.pace_timer = self.rng.randint(50, 110)
 
     def update(self, tiles):
         self.pace_timer -= 1
         if self.pace_timer <= 0:
             self.direction *= -1
-            self.pace_timer = random.randint(80, 140)
+            self.pace_timer = self.rng.randint(80, 140)
 
         self.rect.x += self.speed * self.direction
 
         collided = False
-        for tile in tiles:
+        for tile in tiles.near(self.rect):
             if self.rect.colliderect(tile.rect):
                 self.direction *= -1
                 if self.direction > 0:
@@ -296,30 +775,37 @@ class Enemy(pygame.sprite.Sprite):
                 else:
                     self.rect.right = tile.rect.left
                 collided = True
-                self.pace_timer = random.randint(70, 130)
+                self.pace_timer = self.rng.randint(70, 130)
                 break
 
         if not collided:
             foot_x = self.rect.left if self.direction < 0 else self.rect.right
             foot_probe = Rect(foot_x - 4, self.rect.bottom, 8, 8)
-            if not any(tile.rect.colliderect(foot_probe) for tile in tiles):
+            if not tiles.collides(foot_probe):
                 self.direction *= -1
-                self.pace_timer = random.randint(60, 120)
+                self.pace_timer = self.rng.randint(60, 120)
 
-class HoverEnemy(pygame.sprite.Sprite):
-    def __init__(self, pos):
+class HoverEnemy(StatefulSprite):
+    state_fields = ("rect", "origin", "phase", "shoot_cooldown", "drift")
+
+    @staticmethod
+    def render_image():
+        image = Surface((TILE * 0.9, TILE * 0.6), pygame.SRCALPHA)
+        body_rect = image.get_rect()
+        pygame.draw.ellipse(image, (255, 185, 120), body_rect)
+        pygame.draw.ellipse(image, (90, 60, 140), Rect(8, 6, body_rect.width - 16, body_rect.height - 12))
+        return image
+
+    def __init__(self, pos, rng=random):
         super().__init__()
-        self.image = Surface((TILE * 0.9, TILE * 0.6), pygame.SRCALPHA)
-        body_rect = self.image.get_rect()
-        pygame.draw.ellipse(self.image, (255, 185, 120), body_rect)
-        pygame.draw.ellipse(self.image, (90, 60, 140), Rect(8, 6, body_rect.width - 16, body_rect.height - 12))
+        self.image = sprite_images.get(HoverEnemy, HoverEnemy.render_image)
         self.rect = self.image.get_rect(center=(pos[0] + TILE // 2, pos[1] + TILE // 2))
         self.origin = Vector2(self.rect.center)
-        self.phase = random.randint(0, 120)
-        self.shoot_cooldown = random.randint(70, 120)
-        self.drift = Vector2(random.choice([-1, 1]) * 0.6, 0)
+        self.phase = rng.randint(0, 120)
+        self.shoot_cooldown = rng.randint(70, 120)
+        self.drift = Vector2(rng.choice([-1, 1]) * 0.6, 0)
 
-    def update(self, tiles, hazard_projectiles: pygame.sprite.Group, sound_callback=None, sound=None):
+    def update(self, tiles, hazard_projectiles: "ProjectileField", sound_callback=None, sound=None):
         self.phase += 1
         float_y = math.sin(self.phase / 35) * 20
         sway_x = math.cos(self.phase / 40) * 16
@@ -327,27 +813,34 @@ class HoverEnemy(pygame.sprite.Sprite):
         self.rect.center = (self.origin.x + sway_x, self.origin.y + float_y)
         self.shoot_cooldown -= 1
         if self.shoot_cooldown <= 0:
-            hazard_projectiles.add(Projectile(self.rect.center, Vector2(0, 1), color=(255, 150, 90), speed=8, radius=8))
+            hazard_projectiles.spawn(self.rect.center, Vector2(0, 1), color=(255, 150, 90), speed=8, radius=8)
             if sound_callback:
                 sound_callback(sound)
             self.shoot_cooldown = 110
 
-class GroundShooter(pygame.sprite.Sprite):
-    def __init__(self, pos):
+class GroundShooter(StatefulSprite):
+    state_fields = ("rect", "direction", "shoot_cooldown")
+
+    @staticmethod
+    def render_image():
+        image = Surface((TILE * 0.9, TILE * 0.9), pygame.SRCALPHA)
+        body_rect = image.get_rect()
+        pygame.draw.rect(image, (255, 140, 120), body_rect, border_radius=8)
+        pygame.draw.rect(image, (60, 40, 70), body_rect.inflate(-8, -8), border_radius=8)
+        pygame.draw.circle(image, (255, 220, 220), (body_rect.width // 2, body_rect.height // 3), 8)
+        return image
+
+    def __init__(self, pos, rng=random):
         super().__init__()
-        self.image = Surface((TILE * 0.9, TILE * 0.9), pygame.SRCALPHA)
-        body_rect = self.image.get_rect()
-        pygame.draw.rect(self.image, (255, 140, 120), body_rect, border_radius=8)
-        pygame.draw.rect(self.image, (60, 40, 70), body_rect.inflate(-8, -8), border_radius=8)
-        pygame.draw.circle(self.image, (255, 220, 220), (body_rect.width // 2, body_rect.height // 3), 8)
+        self.image = sprite_images.get(GroundShooter, GroundShooter.render_image)
         self.rect = self.image.get_rect(topleft=pos)
-        self.direction = random.choice([-1, 1])
+        self.direction = rng.choice([-1, 1])
         self.speed = 2.4
-        self.shoot_cooldown = random.randint(50, 90)
+        self.shoot_cooldown = rng.randint(50, 90)
 
-    def update(self, tiles, hazard_projectiles: pygame.sprite.Group, sound_callback=None, sound=None, player=None):
+    def update(self, tiles, hazard_projectiles: "ProjectileField", sound_callback=None, sound=None, player=None):
         self.rect.x += self.speed * self.direction
-        for tile in tiles:
+        for tile in tiles.near(self.rect):
             if self.rect.colliderect(tile.rect):
                 if self.direction > 0:
                     self.rect.right = tile.rect.left
@@ -358,61 +851,67 @@ class GroundShooter(pygame.sprite.Sprite):
 
         foot_x = self.rect.left if self.direction < 0 else self.rect.right
         foot_probe = Rect(foot_x - 4, self.rect.bottom, 8, 8)
-        if not any(tile.rect.colliderect(foot_probe) for tile in tiles):
+        if not tiles.collides(foot_probe):
             self.direction *= -1
 
         if player:
             self.shoot_cooldown -= 1
             if self.shoot_cooldown <= 0:
                 direction = Vector2(player.rect.center) - Vector2(self.rect.center)
-                hazard_projectiles.add(Projectile(self.rect.center, direction, color=(255, 180, 100), speed=8, radius=9))
+                hazard_projectiles.spawn(self.rect.center, direction, color=(255, 180, 100), speed=8, radius=9)
                 if sound_callback:
                     sound_callback(sound)
                 self.shoot_cooldown = 120
 
-class FlameStalker(pygame.sprite.Sprite):
-    def __init__(self, pos):
+class FlameStalker(StatefulSprite):
+    state_fields = ("rect", "direction", "pace_timer", "dash_frames", "dash_timer", "volley_cooldown")
+
+    @staticmethod
+    def render_image():
+        image = Surface((TILE, TILE), pygame.SRCALPHA)
+        body_rect = image.get_rect()
+        pygame.draw.rect(image, (255, 120, 60), body_rect, border_radius=10)
+        pygame.draw.rect(image, (120, 40, 20), body_rect.inflate(-10, -10), border_radius=8)
+        pygame.draw.circle(image, (255, 220, 180), (body_rect.centerx, body_rect.centery), 6)
+        return image
+
+    def __init__(self, pos, rng=random):
         super().__init__()
-        self.image = Surface((TILE, TILE), pygame.SRCALPHA)
-        body_rect = self.image.get_rect()
-        pygame.draw.rect(self.image, (255, 120, 60), body_rect, border_radius=10)
-        pygame.draw.rect(self.image, (120, 40, 20), body_rect.inflate(-10, -10), border_radius=8)
-        pygame.draw.circle(self.image, (255, 220, 180), (body_rect.centerx, body_rect.centery), 6)
+        self.rng = rng
+        self.image = sprite_images.get(FlameStalker, FlameStalker.render_image)
         self.rect = self.image.get_rect(topleft=pos)
         self.speed = 3.2
-        self.direction = random.choice([-1, 1])
-        self.pace_timer = random.randint(50, 90)
+        self.direction = self.rng.choice([-1, 1])
+        self.pace_timer = self.rng.randint(50, 90)
         self.dash_frames = 0
-        self.dash_timer = random.randint(90, 160)
-        self.volley_cooldown = random.randint(60, 110)
+        self.dash_timer = self.rng.randint(90, 160)
+        self.volley_cooldown = self.rng.randint(60, 110)
 
-    def update(self, tiles, hazard_projectiles: pygame.sprite.Group, player=None, sound_callback=None, sound=None):
+    def update(self, tiles, hazard_projectiles: "ProjectileField", player=None, sound_callback=None, sound=None):
         self.pace_timer -= 1
         self.dash_timer -= 1
         self.volley_cooldown -= 1
         if self.dash_timer <= 0:
             self.dash_frames = 28
-            self.dash_timer = random.randint(120, 180)
+            self.dash_timer = self.rng.randint(120, 180)
             if player:
                 self.direction = 1 if player.rect.centerx > self.rect.centerx else -1
             for angle in (-0.2, 0, 0.2):
                 direction = Vector2(self.direction, -0.2).rotate_rad(angle)
-                hazard_projectiles.add(
-                    Projectile(self.rect.center, direction, color=(255, 110, 80), speed=9, radius=8)
-                )
+                hazard_projectiles.spawn(self.rect.center, direction, color=(255, 110, 80), speed=9, radius=8)
             if sound_callback:
                 sound_callback(sound)
 
         if self.pace_timer <= 0:
             self.direction *= -1
-            self.pace_timer = random.randint(60, 110)
+            self.pace_timer = self.rng.randint(60, 110)
 
         speed = self.speed * (1.8 if self.dash_frames > 0 else 1)
         if self.dash_frames > 0:
             self.dash_frames -= 1
         self.rect.x += speed * self.direction
 
-        for tile in tiles:
+        for tile in tiles.near(self.rect):
             if self.rect.colliderect(tile.rect):
                 if self.direction > 0:
                     self.rect.right = tile.rect.left
@@ -424,45 +923,200 @@ class FlameStalker(pygame.sprite.Sprite):
 
         foot_x = self.rect.left if self.direction < 0 else self.rect.right
         foot_probe = Rect(foot_x - 4, self.rect.bottom, 8, 8)
-        if not any(tile.rect.colliderect(foot_probe) for tile in tiles):
+        if not tiles.collides(foot_probe):
             self.direction *= -1
 
         if player and self.volley_cooldown <= 0:
             direction = Vector2(player.rect.center) - Vector2(self.rect.center)
-            hazard_projectiles.add(
-                Projectile(self.rect.center, direction, color=(255, 160, 90), speed=10, radius=10)
-            )
+            hazard_projectiles.spawn(self.rect.center, direction, color=(255, 160, 90), speed=10, radius=10)
             if sound_callback:
                 sound_callback(sound)
             self.volley_cooldown = 110
 
-class Projectile(pygame.sprite.Sprite):
-    def __init__(
-        self,
-        pos,
-        direction,
-        color=(230, 60, 60),
-        speed=PROJECTILE_SPEED,
-        radius=10,
-        damage=1,
-    ):
-        super().__init__()
-        self.image = Surface((radius * 2, radius * 2), pygame.SRCALPHA)
-        pygame.draw.circle(self.image, color, (radius, radius), radius)
-        pygame.draw.circle(self.image, (255, 240, 240), (radius, radius), radius // 2)
-        self.rect = self.image.get_rect(center=pos)
-        self.velocity = Vector2(direction).normalize() * speed if direction.length() != 0 else Vector2(speed, 0)
-        self.damage = damage
-
-    def update(self):
-        self.rect.centerx += int(self.velocity.x)
-        self.rect.centery += int(self.velocity.y)
-        if self.rect.right < 0 or self.rect.left > WIDTH or self.rect.bottom < 0 or self.rect.top > HEIGHT:
-            self.kill()
+class ProjectileField:
+    """Every live projectile fired by one side, stored as NumPy arrays in firing order and stepped in bulk."""
+
+    FIELDS = ("rect", "prev", "delta", "damage", "kind")
+    # Up to this many projectiles, Python lists and Rect.collidelistall beat
+    # NumPy masks, whose fixed cost per call dominates small arrays.
+    LIST_LIMIT = 48
+
+    def __init__(self, capacity=256):
+        self.count = 0
+        self.rect = np.zeros((capacity, 4), dtype=np.int32)
+        # Kept as whole rects, the step (dx, dy, 0, 0) included, so stepping
+        # copies and adds full rows, which NumPy does faster than column slices.
+        self.prev = np.zeros((capacity, 4), dtype=np.int32)
+        self.delta = np.zeros((capacity, 4), dtype=np.int32)
+        self.damage = np.zeros(capacity, dtype=np.int32)
+        self.kind = np.zeros(capacity, dtype=np.int32)
+        self.kinds = {}
+        self.images = []
+        self.rect_rows = None
+
+    def __len__(self):
+        return self.count
+
+    @staticmethod
+    def render_image(color, radius):
+        image = Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(image, color, (radius, radius), radius)
+        pygame.draw.circle(image, (255, 240, 240), (radius, radius), radius // 2)
+        return image
 
-class Boss(pygame.sprite.Sprite):
-    def __init__(self, pos):
+    def kind_for(self, color, radius):
+        key = (tuple(color), radius)
+        kind = self.kinds.get(key)
+        if kind is None:
+            kind = self.kinds[key] = len(self.images)
+            self.images.append(
+                sprite_images.get((ProjectileField, *key), lambda: ProjectileField.render_image(color, radius))
+            )
+        return kind
+
+    def grow(self):
+        for name in self.FIELDS:
+            column = getattr(self, name)
+            grown = np.zeros((len(column) * 2, *column.shape[1:]), dtype=column.dtype)
+            grown[: self.count] = column[: self.count]
+            setattr(self, name, grown)
+
+    def spawn(self, pos, direction, color=(230, 60, 60), speed=PROJECTILE_SPEED, radius=10, damage=1):
+        if self.count == len(self.rect):
+            self.grow()
+        velocity = Vector2(direction)
+        if velocity.length() != 0:
+            velocity.scale_to_length(speed)
+        else:
+            velocity.update(speed, 0)
+        # Rect does the centring so rounding matches sprite rects exactly.
+        rect = Rect(0, 0, radius * 2, radius * 2)
+        rect.center = pos
+        i = self.count
+        self.rect[i] = rect
+        self.prev[i] = rect
+        self.delta[i] = (int(velocity.x), int(velocity.y), 0, 0)
+        self.damage[i] = damage
+        self.kind[i] = self.kind_for(color, radius)
+        self.count += 1
+        self.rect_rows = None
+
+    def clear(self):
+        self.count = 0
+        self.rect_rows = None
+
+    def keep(self, mask):
+        """Drop the projectiles where mask is False, preserving order."""
+        kept = int(mask.sum())
+        if kept == self.count:
+            return
+        for name in self.FIELDS:
+            column = getattr(self, name)
+            column[:kept] = column[: self.count][mask]
+        self.count = kept
+        self.rect_rows = None
+
+    def remove(self, mask):
+        self.keep(~mask)
+
+    def step(self, bounds):
+        """Move every projectile one tick and drop those entirely outside bounds (the camera view)."""
+        count = self.count
+        if not count:
+            return
+        rect = self.rect[:count]
+        self.prev[:count] = rect
+        rect += self.delta[:count]
+        if count > self.LIST_LIMIT:
+            x, y, w, h = rect.T
+            self.rect_rows = None
+            self.keep((x + w >= bounds.left) & (x <= bounds.right) & (y + h >= bounds.top) & (y <= bounds.bottom))
+            return
+        # Growing bounds by a pixel each way keeps projectiles that only touch its edges.
+        rows = rect.tolist()
+        inside = bounds.inflate(2, 2).collidelistall(rows)
+        if len(inside) < count:
+            mask = np.zeros(count, dtype=bool)
+            mask[inside] = True
+            self.keep(mask)
+            rows = [rows[index] for index in inside]
+        self.rect_rows = rows
+
+    def rows(self):
+        """The live rects as [x, y, w, h] lists, cached until the field changes."""
+        if self.rect_rows is None:
+            self.rect_rows = self.rect[: self.count].tolist()
+        return self.rect_rows
+
+    def hits(self, rect):
+        """Boolean mask of projectiles overlapping rect (Rect.colliderect semantics), or None if none do."""
+        count = self.count
+        if not count:
+            return None
+        if count > self.LIST_LIMIT:
+            x, y, w, h = self.rect[:count].T
+            mask = (x < rect.right) & (x + w > rect.left) & (y < rect.bottom) & (y + h > rect.top)
+            return mask if mask.any() else None
+        hit = rect.collidelistall(self.rows())
+        if not hit:
+            return None
+        mask = np.zeros(count, dtype=bool)
+        mask[hit] = True
+        return mask
+
+    def touching(self, rect):
+        """The [x, y, w, h] rects of projectiles overlapping rect, for when no mask is needed."""
+        if not self.count:
+            return []
+        if self.count > self.LIST_LIMIT:
+            hit = self.hits(rect)
+            return [] if hit is None else self.rect[: self.count][hit].tolist()
+        rows = self.rows()
+        return [rows[index] for index in rect.collidelistall(rows)]
+
+    def rects(self):
+        return tuple(map(tuple, self.rows()))
+
+    def blits(self, view, alpha=1.0):
+        """(image, screen position) pairs for the projectiles overlapping view, blended by alpha."""
+        count = self.count
+        if not count:
+            return []
+        rect = self.rect[:count]
+        visible = np.flatnonzero(
+            (rect[:, 0] < view.right)
+            & (rect[:, 0] + rect[:, 2] > view.left)
+            & (rect[:, 1] < view.bottom)
+            & (rect[:, 1] + rect[:, 3] > view.top)
+        )
+        pos = rect[visible, :2]
+        if alpha < 1:
+            prev = self.prev[visible, :2]
+            pos = np.round(prev + (pos - prev) * alpha).astype(np.int32)
+        pos = pos - view.topleft
+        images = self.images
+        return [(images[kind], xy) for kind, xy in zip(self.kind[visible].tolist(), pos.tolist())]
+
+class Boss(StatefulSprite):
+    state_fields = (
+        "rect",
+        "velocity",
+        "on_ground",
+        "health",
+        "jump_cooldown",
+        "shot_cooldown",
+        "dash_cooldown",
+        "volley_cooldown",
+        "beam_cooldown",
+        "rain_cooldown",
+        "pulse_cooldown",
+        "dying",
+        "exit_velocity",
+    )
+
+    def __init__(self, pos, rng=random):
         super().__init__()
+        self.rng = rng
         self.base_color = (70, 30, 120)
         self.eye_color = (255, 110, 150)
         self.image = self.render_boss_image()
@@ -497,7 +1151,7 @@ class Boss(pygame.sprite.Sprite):
 
     def move_and_collide(self, tiles):
         self.rect.x += int(self.velocity.x)
-        for tile in tiles:
+        for tile in tiles.near(self.rect):
             if self.rect.colliderect(tile.rect):
                 if self.velocity.x > 0:
                     self.rect.right = tile.rect.left
@@ -506,7 +1160,7 @@ class Boss(pygame.sprite.Sprite):
 
         self.rect.y += int(self.velocity.y)
         self.on_ground = False
-        for tile in tiles:
+        for tile in tiles.near(self.rect):
             if self.rect.colliderect(tile.rect):
                 if self.velocity.y > 0:
                     self.rect.bottom = tile.rect.top
@@ -516,12 +1170,20 @@ class Boss(pygame.sprite.Sprite):
                     self.rect.top = tile.rect.bottom
                     self.velocity.y = 0
 
+    def set_state(self, state):
+        super().set_state(state)
+        # Hit flashes are drawn onto the image, so rebuild it from scratch.
+        self.image = self.render_boss_image(dark_eye=self.dying)
+
     def start_death(self):
         self.dying = True
         self.image = self.render_boss_image(dark_eye=True)
         self.exit_velocity = Vector2(6, -12)
 
-    def update(self, tiles, player, hazard_projectiles: pygame.sprite.Group, volley_sound=None, sound_callback=None):
+    def update(
+        self, tiles, player, hazard_projectiles: "ProjectileField", volley_sound=None, sound_callback=None, view=None
+    ):
+        """Move and attack for one tick; rain falls across view (the camera view, world coordinates)."""
         if self.dying:
             self.rect.x += int(self.exit_velocity.x)
             self.rect.y += int(self.exit_velocity.y)
@@ -539,19 +1201,20 @@ class Boss(pygame.sprite.Sprite):
 
         if self.shot_cooldown <= 0:
             direction = Vector2(player.rect.center) - Vector2(self.rect.center)
-            hazard_projectiles.add(Projectile(self.rect.center, direction, color=(255, 120, 255), speed=10, radius=12))
+            hazard_projectiles.spawn(self.rect.center, direction, color=(255, 120, 255), speed=10, radius=12)
             self.shot_cooldown = 70
 
         if self.beam_cooldown <= 0:
-            hazard_projectiles.add(Projectile(self.rect.midleft, Vector2(-1, 0), color=(255, 200, 120), speed=12, radius=10))
-            hazard_projectiles.add(Projectile(self.rect.midright, Vector2(1, 0), color=(255, 200, 120), speed=12, radius=10))
-            hazard_projectiles.add(Projectile(self.rect.center, Vector2(0, -1), color=(255, 200, 120), speed=12, radius=10))
+            hazard_projectiles.spawn(self.rect.midleft, Vector2(-1, 0), color=(255, 200, 120), speed=12, radius=10)
+            hazard_projectiles.spawn(self.rect.midright, Vector2(1, 0), color=(255, 200, 120), speed=12, radius=10)
+            hazard_projectiles.spawn(self.rect.center, Vector2(0, -1), color=(255, 200, 120), speed=12, radius=10)
             self.beam_cooldown = 240
 
         if self.rain_cooldown <= 0:
+            view = view or Rect(0, 0, WIDTH, HEIGHT)
             for _ in range(5):
-                drop_x = random.randint(80, WIDTH - 80)
-                hazard_projectiles.add(Projectile((drop_x, 0), Vector2(0, 1), color=(255, 160, 60), speed=7, radius=9))
+                drop_x = self.rng.randint(view.left + 80, view.right - 80)
+                hazard_projectiles.spawn((drop_x, view.top), Vector2(0, 1), color=(255, 160, 60), speed=7, radius=9)
             self.rain_cooldown = 180
 
         if self.volley_cooldown <= 0:
@@ -559,9 +1222,7 @@ class Boss(pygame.sprite.Sprite):
             center = Vector2(self.rect.center)
             for angle in angles:
                 rad = math.radians(angle)
-                hazard_projectiles.add(
-                    Projectile(center, Vector2(math.cos(rad), math.sin(rad)), color=(120, 255, 220), speed=7, radius=9)
-                )
+                hazard_projectiles.spawn(center, Vector2(math.cos(rad), math.sin(rad)), color=(120, 255, 220), speed=7, radius=9)
             self.volley_cooldown = 220
             if sound_callback:
                 sound_callback(volley_sound)
@@ -569,7 +1230,7 @@ class Boss(pygame.sprite.Sprite):
         if self.pulse_cooldown <= 0:
             offsets = [Vector2(1, 0), Vector2(-1, 0), Vector2(0, 1), Vector2(0, -1)]
             for direction in offsets:
-                hazard_projectiles.add(Projectile(self.rect.center, direction, color=(255, 90, 200), speed=14, radius=11))
+                hazard_projectiles.spawn(self.rect.center, direction, color=(255, 90, 200), speed=14, radius=11)
             self.pulse_cooldown = 300
 
         self.move_and_collide(tiles)
@@ -578,6 +1239,85 @@ class Boss(pygame.sprite.Sprite):
         self.health -= amount
         pygame.draw.rect(self.image, (255, 255, 255), self.image.get_rect(), 2, border_radius=14)
 
+# Per-frame control bits shared by every input source.
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_JUMP = 4
+INPUT_SHOOT = 8
+INPUT_SHIELD = 16
+
+class KeyboardInput:
+    """Live input read from the keyboard state each frame."""
+
+    def poll(self, player):
+        keys = pygame.key.get_pressed()
+        buttons = 0
+        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+            buttons |= INPUT_LEFT
+        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+            buttons |= INPUT_RIGHT
+        if keys[pygame.K_SPACE] or keys[pygame.K_w] or keys[pygame.K_UP]:
+            buttons |= INPUT_JUMP
+        if keys[pygame.K_e]:
+            buttons |= INPUT_SHOOT
+        if keys[pygame.K_f]:
+            buttons |= INPUT_SHIELD
+        return buttons
+
+class NullInput:
+    """Never presses anything; the default for headless runs."""
+
+    def poll(self, player):
+        return 0
+
+class FrameMaskInput:
+    """Replays an array of per-frame button bitmasks, then idles (or loops)."""
+
+    def __init__(self, masks, loop=False):
+        self.masks = array.array("B", masks)
+        self.loop = loop
+        self.frame = 0
+
+    @classmethod
+    def load(cls, path, loop=False):
+        return cls(Path(path).read_bytes(), loop=loop)
+
+    def poll(self, player):
+        if self.frame >= len(self.masks):
+            if not self.loop or not self.masks:
+                return 0
+            self.frame = 0
+        buttons = self.masks[self.frame]
+        self.frame += 1
+        return buttons
+
+class ScriptedInput:
+    """Asks a policy callable(frame, player) for each frame's bitmask (bots, tests)."""
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.frame = 0
+
+    def poll(self, player):
+        buttons = self.policy(self.frame, player)
+        self.frame += 1
+        return buttons
+
+class RecordingInput:
+    """Passes another source through while recording its bitmasks for replay."""
+
+    def __init__(self, source):
+        self.source = source
+        self.masks = array.array("B")
+
+    def poll(self, player):
+        buttons = self.source.poll(player)
+        self.masks.append(buttons)
+        return buttons
+
+    def save(self, path):
+        Path(path).write_bytes(self.masks.tobytes())
+
 class Player(pygame.sprite.Sprite):
     def __init__(self, pos, god_mode=False):
         super().__init__()
@@ -605,32 +1345,31 @@ class Player(pygame.sprite.Sprite):
         self.auto_walk_right = False
         self.op_projectiles = False
 
-    def handle_input(self):
-        keys = pygame.key.get_pressed()
+    def handle_input(self, buttons):
         if self.auto_walk_right:
             self.velocity.x = PLAYER_SPEED * 0.6
             self.facing = 1
             return None
         self.velocity.x = 0
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+        if buttons & INPUT_LEFT:
             self.velocity.x = -PLAYER_SPEED
             self.facing = -1
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+        if buttons & INPUT_RIGHT:
             self.velocity.x = PLAYER_SPEED
             self.facing = 1
-        if (keys[pygame.K_SPACE] or keys[pygame.K_w] or keys[pygame.K_UP]) and self.on_ground:
+        if buttons & INPUT_JUMP and self.on_ground:
             self.velocity.y = JUMP_FORCE
             self.on_ground = False
         self.shielding = (
-            (keys[pygame.K_f])
+            bool(buttons & INPUT_SHIELD)
             and self.shield_break_timer <= 0
             and self.shield_energy > 5
         )
-        if keys[pygame.K_e] and self.shoot_cooldown <= 0:
+        if buttons & INPUT_SHOOT and self.shoot_cooldown <= 0:
             self.shoot_cooldown = 18
             damage = 19 if self.op_projectiles else 1
             color = (255, 80, 220) if self.op_projectiles else (230, 60, 60)
-            return Projectile(self.rect.center, Vector2(self.facing, 0), color=color, damage=damage)
+            return {"pos": self.rect.center, "direction": Vector2(self.facing, 0), "color": color, "damage": damage}
         return None
 
     def apply_gravity(self):
@@ -655,7 +1394,7 @@ class Player(pygame.sprite.Sprite):
 
     def horizontal_movement(self, tiles):
         self.rect.x += int(self.velocity.x)
-        for tile in tiles:
+        for tile in tiles.near(self.rect):
             if self.rect.colliderect(tile.rect):
                 if self.velocity.x > 0:
                     self.rect.right = tile.rect.left
@@ -665,7 +1404,7 @@ class Player(pygame.sprite.Sprite):
     def vertical_movement(self, tiles):
         self.rect.y += int(self.velocity.y)
         self.on_ground = False
-        for tile in tiles:
+        for tile in tiles.near(self.rect):
             if self.rect.colliderect(tile.rect):
                 if self.velocity.y > 0:
                     self.rect.bottom = tile.rect.top
@@ -675,8 +1414,8 @@ class Player(pygame.sprite.Sprite):
                     self.rect.top = tile.rect.bottom
                     self.velocity.y = 0
 
-    def update(self, tiles):
-        projectile = self.handle_input()
+    def update(self, tiles, input_source):
+        shot = self.handle_input(input_source.poll(self))
         self.apply_gravity()
         self.horizontal_movement(tiles)
         self.vertical_movement(tiles)
@@ -699,7 +1438,7 @@ class Player(pygame.sprite.Sprite):
         elif self.shield_break_timer <= 0 and self.shield_regen_delay <= 0:
             regen_rate = 0.45 + (0.2 if self.shield_time > 0 else 0)
             self.shield_energy = min(self.shield_energy_max, self.shield_energy + regen_rate)
-        return projectile
+        return shot
 
     def register_hit(self):
         if self.god_mode:
@@ -711,8 +1450,305 @@ class Player(pygame.sprite.Sprite):
             self.damage_buffer = 0
         return self.health_bars > 0
 
+class SpatialGrid:
+    """Uniform grid that buckets sprites by the TILE cells their rects cover."""
+
+    def __init__(self, cell_size=TILE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.spans = {}
+
+    def cell_span(self, rect):
+        size = self.cell_size
+        rows = range(rect.top // size, (rect.bottom - 1) // size + 1)
+        cols = range(rect.left // size, (rect.right - 1) // size + 1)
+        return rows, cols
+
+    def insert(self, sprite):
+        rows, cols = self.spans[sprite] = self.cell_span(sprite.rect)
+        for row in rows:
+            for col in cols:
+                self.cells.setdefault((col, row), []).append(sprite)
+
+    def remove(self, sprite):
+        span = self.spans.pop(sprite, None)
+        rows, cols = span or self.cell_span(sprite.rect)
+        for row in rows:
+            for col in cols:
+                bucket = self.cells.get((col, row))
+                if bucket and sprite in bucket:
+                    bucket.remove(sprite)
+                    if not bucket:
+                        del self.cells[(col, row)]
+
+    def move(self, sprite):
+        """Re-file a sprite after its rect changed; a no-op while it stays in the same cells."""
+        if self.spans.get(sprite) != self.cell_span(sprite.rect):
+            self.remove(sprite)
+            self.insert(sprite)
+
+    def query(self, rect):
+        """Return sprites in the cells overlapped by rect, in row-major order without duplicates."""
+        rows, cols = self.cell_span(rect)
+        found = {}
+        for row in rows:
+            for col in cols:
+                for sprite in self.cells.get((col, row), ()):
+                    found[sprite] = None
+        return list(found)
+
+class SolidIndex:
+    """Collision view over a level: static tiles in a SpatialGrid plus a small bucket of moving solids."""
+
+    def __init__(self, static_sprites, dynamic_sprites):
+        self.grid = SpatialGrid()
+        for sprite in static_sprites:
+            self.grid.insert(sprite)
+        self.dynamic = dynamic_sprites
+
+    def near(self, rect):
+        # Moving platforms are few and change cells every frame, so they are
+        # scanned directly instead of being re-bucketed.
+        return self.grid.query(rect) + self.dynamic.sprites()
+
+    def collides(self, rect):
+        return any(solid.rect.colliderect(rect) for solid in self.near(rect))
+
+class CollisionManager:
+    """Player and player-shot collisions: fixed sprites in one grid shared by all layers, movers scanned directly."""
+
+    # Fixed sprites are filed once, under the cell holding their top-left
+    # corner. None is larger than a TILE, so a rect can only touch those
+    # filed less than a TILE above or left of it.
+    CELL = TILE * 4
+
+    def __init__(self):
+        self.layers = {}
+        self.handlers = []
+        self.layer_ranks = []
+        self.cells = {}
+        self.source = None
+        self.movers = []
+        self.fields = []
+        self.shot_hits = []
+
+    def layer(self, name, on_player=None, shot_rank=None, field=None):
+        """Register a layer. Shots hit the moving layer of lowest shot_rank they touch; a field is kept for good."""
+        self.layers[name] = len(self.handlers)
+        self.handlers.append(on_player)
+        self.layer_ranks.append(shot_rank)
+        if field is not None:
+            self.fields.append((self.layers[name], field))
+
+    def place(self, source, layers):
+        """File (name, sprites) layers that never move, replacing those placed for an earlier source."""
+        self.source = source
+        self.cells = {}
+        cells = self.cells
+        size = self.CELL
+        for name, sprites in layers:
+            index = self.layers[name]
+            for sprite in sprites:
+                rect = sprite.rect
+                cells.setdefault((rect.x // size, rect.y // size), []).append((index, sprite))
+
+    def fill(self, layers):
+        """Take this tick's moving (name, sprites) layers, replacing last tick's."""
+        # Movers are few and change cells every tick, so like moving platforms
+        # in SolidIndex they are scanned directly instead of being re-filed.
+        self.movers = [
+            (self.layers[name], sprites, [sprite.rect for sprite in sprites]) for name, sprites in layers if sprites
+        ]
+        self.shot_hits = []
+
+    def query(self, rect):
+        """(layer, sprite) pairs filed near rect: every fixed sprite that can touch it, and a few more."""
+        cells = self.cells
+        size = self.CELL
+        reach = TILE - 1
+        found = []
+        for row in range((rect.top - reach) // size, (rect.bottom - 1) // size + 1):
+            for col in range((rect.left - reach) // size, (rect.right - 1) // size + 1):
+                bucket = cells.get((col, row))
+                if bucket:
+                    found += bucket
+        return found
+
+    def run(self, player_rect, shots):
+        """Call the handler of every layer the player touches and note what each shot hit."""
+        touched = {}
+        colliderect = player_rect.colliderect
+        for index, sprite in self.query(player_rect):
+            # Placed sprites stay filed after being collected, so check they are still in play.
+            if colliderect(sprite.rect) and sprite.alive():
+                touched.setdefault(index, []).append(sprite)
+        for index, sprites, rects in self.movers:
+            hit = player_rect.collidelistall(rects)
+            if hit:
+                touched.setdefault(index, []).extend(sprites[i] for i in hit)
+        for index, field in self.fields:
+            hit = field.touching(player_rect)
+            if hit:
+                touched.setdefault(index, []).extend(hit)
+        if touched:
+            for index in sorted(touched):
+                if self.handlers[index]:
+                    self.handlers[index](touched[index])
+
+        if not shots.count:
+            return
+        ranks = self.layer_ranks
+        targets = sorted(
+            (mover for mover in self.movers if ranks[mover[0]] is not None), key=lambda mover: ranks[mover[0]]
+        )
+        for row in shots.rows():
+            shot = Rect(row)
+            hits = []
+            for index, sprites, rects in targets:
+                hit = shot.collidelistall(rects)
+                if hit:
+                    hits = [sprites[i] for i in hit]
+                    break
+            self.shot_hits.append(hits)
+
+    def forget_shots(self, mask):
+        """Keep shot hits aligned after shots were removed from the field (mask over its old count)."""
+        if self.shot_hits:
+            self.shot_hits = [hits for hits, gone in zip(self.shot_hits, mask.tolist()) if not gone]
+
+    def resolve_shots(self, shots):
+        """Sprites hit by shots, each once; shots that hit anything are removed from the field."""
+        shot_hits = self.shot_hits
+        self.shot_hits = []
+        if not any(shot_hits):
+            return []
+        shots.remove(np.array([bool(hits) for hits in shot_hits]))
+        found = {}
+        for hits in shot_hits:
+            for sprite in hits:
+                found[sprite] = None
+        return list(found)
+
+class Camera:
+    """Viewport onto a level; on culled levels actors only update inside ``active``, the view plus a margin."""
+
+    def __init__(self, view_size, world_size, margin=TILE * 4):
+        self.view = Rect((0, 0), view_size)
+        # At least the view's size, so clamping pins the view to the top-left
+        # of levels smaller than the screen.
+        self.bounds = Rect(0, 0, max(world_size[0], view_size[0]), max(world_size[1], view_size[1]))
+        self.margin = margin
+        self.active = self.view.inflate(margin * 2, margin * 2)
+        self.previous = None
+        self.target = None
+
+    def follow(self, rect):
+        """Centre the view on rect, clamped to the level edges; a no-op while rect hasn't moved."""
+        center = rect.center
+        if center == self.target:
+            return
+        self.target = center
+        self.view.center = center
+        self.view.clamp_ip(self.bounds)
+        self.active.center = self.view.center
+
+    def apply(self, rect):
+        return rect.move(-self.view.x, -self.view.y)
+
+    def mark(self):
+        """Remember the view position before a simulation tick."""
+        self.previous = self.view.topleft
+
+    def interpolated(self, alpha):
+        """The view blended from its previous position towards the current one."""
+        if self.previous is None or alpha >= 1:
+            return self.view.copy()
+        x, y = self.previous
+        return Rect(round(x + (self.view.x - x) * alpha), round(y + (self.view.y - y) * alpha), *self.view.size)
+
+class LevelData:
+    """Compiled level: a packed grid of static cells plus a table of entities, memory-mapped from a ``.lvl`` file."""
+
+    MAGIC = b"PLVL"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHHHI")
+    ENTITY_DTYPE = np.dtype([("code", "S1"), ("col", "<u2"), ("row", "<u2")])
+    STATIC_CELLS = b"#^B"
+
+    def __init__(self, cols, rows, grid, entities):
+        self.cols = cols
+        self.rows = rows
+        self.grid = grid
+        self.entities = entities
+
+    @classmethod
+    def from_layout(cls, layout):
+        """Compile a text map (list of row strings) into packed form."""
+        rows = len(layout)
+        cols = max((len(row) for row in layout), default=0)
+        grid = np.zeros(rows * cols, dtype=np.uint8)
+        entities = []
+        for row_idx, row in enumerate(layout):
+            for col_idx, cell in enumerate(row):
+                code = cell.encode()
+                if code in cls.STATIC_CELLS:
+                    grid[row_idx * cols + col_idx] = code[0]
+                elif cell != ".":
+                    entities.append((code, col_idx, row_idx))
+        return cls(cols, rows, grid, np.array(entities, dtype=cls.ENTITY_DTYPE))
+
+    def to_bytes(self):
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, self.cols, self.rows, len(self.entities))
+        return header + self.grid.tobytes() + self.entities.tobytes()
+
+    def save(self, path):
+        Path(path).write_bytes(self.to_bytes())
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        magic, version, cols, rows, entity_count = cls.HEADER.unpack_from(buffer, 0)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError(f"not a version {cls.VERSION} compiled level")
+        offset = cls.HEADER.size
+        grid = np.frombuffer(buffer, dtype=np.uint8, count=cols * rows, offset=offset)
+        offset += cols * rows
+        entities = np.frombuffer(buffer, dtype=cls.ENTITY_DTYPE, count=entity_count, offset=offset)
+        return cls(cols, rows, grid, entities)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as handle:
+            buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.from_buffer(buffer)
+
+def compile_levels(directory):
+    """Write every built-in text map to DIRECTORY as level01.lvl, level02.lvl, ..."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index, layout in enumerate(load_levels()):
+        path = directory / f"level{index + 1:02d}.lvl"
+        LevelData.from_layout(layout).save(path)
+        paths.append(path)
+    return paths
+
+def load_compiled_levels(directory):
+    """Load every .lvl file in DIRECTORY, ordered by file name."""
+    return [LevelData.load(path) for path in sorted(Path(directory).glob("*.lvl"))]
+
 class Level:
-    def __init__(self, layout):
+    # Cell size of the per-group actor grids used for camera culling.
+    ACTOR_CELL = TILE * 8
+    # Levels up to this size are simulated whole: the camera's active area
+    # covers most of them anyway, so grid upkeep would cost more than it culls.
+    CULL_MIN_SIZE = (WIDTH * 2, HEIGHT * 2)
+
+    def __init__(self, layout, seed=None):
+        """Build a level from a text map (list of row strings) or a compiled LevelData."""
+        data = layout if isinstance(layout, LevelData) else LevelData.from_layout(layout)
+        # Gameplay randomness (enemy pacing, laser phases, boss rain) draws from
+        # this stream only, so a seed plus an input stream replays exactly.
+        self.rng = random.Random(seed)
         self.tiles = pygame.sprite.Group()
         self.spikes = pygame.sprite.Group()
         self.collectibles = pygame.sprite.Group()
@@ -727,170 +1763,797 @@ class Level:
         self.shields = pygame.sprite.Group()
         self.player_start = Vector2(100, 100)
         self.boss = None
+        self.size = (data.cols * TILE, data.rows * TILE)
+        self.culled = self.size[0] > self.CULL_MIN_SIZE[0] or self.size[1] > self.CULL_MIN_SIZE[1]
+        self.static_layer = None
+        # Bumped whenever sprites are loaded or unloaded, so lookups built from
+        # the groups (the collision grid) know to rebuild.
+        self.revision = 0
+        # Actors are bucketed in coarse per-group grids so the game can update
+        # and draw only the ones near the camera; actor_order keeps results in
+        # the order the actors were created.
+        self.actor_order = {}
+        self.actor_counter = itertools.count()
+
+        self.populate(data)
+        self.solids = SolidIndex(self.tiles, self.moving_platforms)
+        # Spikes and boosters never move; the collision pass looks up the
+        # ones under the player here instead of scanning their groups.
+        self.static_grids = {"spikes": SpatialGrid(), "boosters": SpatialGrid()}
+        for name, grid in self.static_grids.items():
+            for sprite in getattr(self, name):
+                grid.insert(sprite)
+        for sprite in itertools.chain(*self.actor_groups()):
+            self.actor_order[sprite] = next(self.actor_counter)
+        self.index_actors()
+        self.initial_state = self.snapshot()
+
+    def populate(self, data):
+        static_groups = {b"#": (self.tiles, Tile), b"^": (self.spikes, Spike), b"B": (self.boosters, Booster)}
+        for code, (group, sprite_class) in static_groups.items():
+            for index in np.flatnonzero(data.grid == code[0]).tolist():
+                row_idx, col_idx = divmod(index, data.cols)
+                group.add(sprite_class(Vector2(col_idx * TILE, row_idx * TILE)))
+
+        # Entities are stored in row-major order, so the level RNG is consumed
+        # in the same order as when the text map is scanned cell by cell.
+        for code, col_idx, row_idx in data.entities.tolist():
+            self.spawn_entity(code.decode(), Vector2(col_idx * TILE, row_idx * TILE))
+
+    def spawn_entity(self, cell, pos):
+        """Create the sprite(s) for one entity cell, add them to their groups and return them."""
+        if cell == 'P':
+            self.player_start = pos
+            return []
+        if cell == 'K':
+            self.boss = Boss(pos, self.rng)
+            return []
+        if cell == 'G':
+            goal, teleporter = Goal(pos), Teleporter(pos)
+            self.goal.add(goal)
+            self.teleporters.add(teleporter)
+            return [goal, teleporter]
+        if cell == 'C':
+            group, sprite = self.collectibles, Collectible(pos)
+        elif cell == 'S':
+            group, sprite = self.shields, ShieldPickup(pos)
+        elif cell == 'E':
+            group, sprite = self.enemies, Enemy(pos, self.rng)
+        elif cell == 'H':
+            group, sprite = self.hover_enemies, HoverEnemy(pos, self.rng)
+        elif cell == 'R':
+            group, sprite = self.flame_enemies, FlameStalker(pos, self.rng)
+        elif cell == 'M':
+            group, sprite = self.moving_platforms, MovingPlatform(pos, axis="x")
+        elif cell == 'V':
+            group, sprite = self.moving_platforms, MovingPlatform(pos, axis="y")
+        elif cell == 'L':
+            group, sprite = self.lasers, LaserBarrier(pos, rng=self.rng)
+        elif cell == 'T':
+            group, sprite = self.teleporters, Teleporter(pos)
+        else:
+            return []
+        group.add(sprite)
+        return [sprite]
+
+    def mutable_groups(self):
+        return {
+            "enemies": self.enemies,
+            "hover_enemies": self.hover_enemies,
+            "flame_enemies": self.flame_enemies,
+            "moving_platforms": self.moving_platforms,
+            "lasers": self.lasers,
+        }
+
+    def actor_groups(self):
+        return (*self.mutable_groups().values(), self.collectibles, self.shields)
+
+    def index_actors(self):
+        """Rebuild the actor grids from current positions."""
+        self.actor_grids = {}
+        for group in self.actor_groups():
+            grid = self.actor_grids[group] = SpatialGrid(cell_size=self.ACTOR_CELL)
+            for sprite in group:
+                grid.insert(sprite)
+
+    def in_rect(self, group, rect):
+        """Members of group near rect in their original order; the whole group on levels that are not culled."""
+        if not self.culled or not group:
+            return group.sprites()
+        found = self.near(rect, (group,))[0]
+        if len(found) > 1:
+            found.sort(key=self.actor_order.__getitem__)
+        return found
+
+    def refile(self, group, sprite):
+        """Move an actor to the right grid cells after it moved."""
+        if self.culled:
+            self.actor_grids[group].move(sprite)
+
+    def near(self, rect, groups):
+        """Live members of each group in the grid cells overlapped by rect, unordered; one list per group."""
+        if not self.culled:
+            return [group.sprites() for group in groups]
+        rows, cols = self.actor_grids[groups[0]].cell_span(rect)
+        span = len(rows) * len(cols)
+        keys = None
+        found = []
+        for group in groups:
+            cells = self.actor_grids[group].cells
+            if len(cells) < span:
+                # Fewer occupied cells than the rect covers: walk those instead.
+                group_keys = [(col, row) for col, row in cells if row in rows and col in cols]
+            else:
+                if keys is None:
+                    keys = [(col, row) for row in rows for col in cols]
+                group_keys = keys
+            members = {}
+            for key in group_keys:
+                for sprite in cells.get(key, ()):
+                    members[sprite] = None
+            # Killed sprites stay filed until the next restore; every actor belongs
+            # to exactly one group, so alive() means it is still in this one.
+            found.append([sprite for sprite in members if sprite.alive()])
+        return found
+
+    def statics_in_rect(self, name, rect):
+        """Spikes or boosters in the grid cells overlapped by rect; all of them on levels that are not culled."""
+        if not self.culled:
+            return getattr(self, name).sprites()
+        return self.static_grids[name].query(rect)
+
+    def snapshot(self):
+        """Capture everything that changes during play; static geometry is shared, not copied."""
+        return {
+            "rng": self.rng.getstate(),
+            "collectibles": tuple(self.collectibles),
+            "shields": tuple(self.shields),
+            "groups": {
+                name: tuple((sprite, sprite.get_state()) for sprite in group)
+                for name, group in self.mutable_groups().items()
+            },
+            "boss": (self.boss, self.boss.get_state()) if self.boss else None,
+        }
+
+    def restore(self, snapshot):
+        """Put the level back to a snapshot, reusing the existing sprite objects."""
+        self.rng.setstate(snapshot["rng"])
+        self.collectibles.empty()
+        self.collectibles.add(*snapshot["collectibles"])
+        self.shields.empty()
+        self.shields.add(*snapshot["shields"])
+        groups = self.mutable_groups()
+        for name, entries in snapshot["groups"].items():
+            group = groups[name]
+            group.empty()
+            for sprite, state in entries:
+                sprite.set_state(state)
+                group.add(sprite)
+        self.boss = None
+        if snapshot["boss"]:
+            self.boss, state = snapshot["boss"]
+            self.boss.set_state(state)
+        self.index_actors()
+
+    def reset(self):
+        self.restore(self.initial_state)
+
+    def static_groups(self):
+        # Only what was always drawn first is baked; exits and boosters are
+        # drawn over pickups and enemies, so they stay sprites.
+        return (self.tiles, self.spikes)
+
+    def static_blits(self, view):
+        """(surface, dest[, area]) tuples that draw the static geometry inside view from a layer baked on first use."""
+        if self.static_layer is None:
+            layer = Surface(self.size, pygame.SRCALPHA)
+            profiler.count("surface_allocs")
+            for group in self.static_groups():
+                group.draw(layer)
+            if pygame.display.get_surface() is not None:
+                layer = layer.convert_alpha()
+            self.static_layer = layer
+        return [(self.static_layer, (0, 0), view)]
+
+    def stream(self, rect):
+        """Make sure everything near rect is loaded; whole levels are always resident."""
+
+class LevelChunk:
+    """Static contents of one chunk: its sprites by group name and their baked layer."""
+
+    def __init__(self, key, rect, statics, layer):
+        self.key = key
+        self.rect = rect
+        self.statics = statics
+        self.layer = layer
+
+class ChunkedLevel(Level):
+    """Level streamed in CHUNK x CHUNK tile squares around the camera, with the next ring built in the background."""
+
+    CHUNK = 16
+    CHUNK_PX = CHUNK * TILE
+    # Maps with more chunks than this are streamed; smaller ones load whole.
+    STREAM_MIN_CHUNKS = 8
+    executor = None
+
+    def __init__(self, layout, seed=None):
+        self.chunks = {}
+        self.pending = {}
+        self.dormant = {}
+        self.actor_origin = {}
+        super().__init__(layout, seed)
+
+    @classmethod
+    def loader(cls):
+        if cls.executor is None:
+            cls.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chunk-loader")
+        return cls.executor
+
+    def populate(self, data):
+        self.data = data
+        self.chunk_counts = (-(-data.cols // self.CHUNK), -(-data.rows // self.CHUNK))
+        self.chunk_entities = {}
+        # Render shared images here so loader threads only ever read the registry.
+        for sprite_class in (Tile, Spike, Booster, Goal, Teleporter):
+            sprite_images.get(sprite_class, sprite_class.render_image)
+        for code, col_idx, row_idx in data.entities.tolist():
+            cell = code.decode()
+            if cell in "PK":
+                self.spawn_entity(cell, Vector2(col_idx * TILE, row_idx * TILE))
+            else:
+                key = (col_idx // self.CHUNK, row_idx // self.CHUNK)
+                self.chunk_entities.setdefault(key, []).append((cell, col_idx, row_idx))
+
+    def chunk_key(self, point):
+        cols, rows = self.chunk_counts
+        col = min(max(int(point[0]) // self.CHUNK_PX, 0), cols - 1)
+        row = min(max(int(point[1]) // self.CHUNK_PX, 0), rows - 1)
+        return col, row
+
+    def chunk_keys(self, rect):
+        """Keys of the chunks overlapping rect, row-major."""
+        left, top = self.chunk_key(rect.topleft)
+        right, bottom = self.chunk_key((rect.right - 1, rect.bottom - 1))
+        return [(col, row) for row in range(top, bottom + 1) for col in range(left, right + 1)]
+
+    def build_chunk(self, key):
+        """Create a chunk's static sprites and bake its layer; safe to run on the loader thread."""
+        col, row = key
+        first_col, first_row = col * self.CHUNK, row * self.CHUNK
+        rect = Rect(first_col * TILE, first_row * TILE, self.CHUNK_PX, self.CHUNK_PX).clip(Rect((0, 0), self.size))
+        cells = self.data.grid.reshape(self.data.rows, self.data.cols)
+        cells = cells[first_row : first_row + self.CHUNK, first_col : first_col + self.CHUNK]
+        statics = {"tiles": [], "spikes": [], "teleporters": [], "goal": [], "boosters": []}
+        for code, name, sprite_class in ((b"#", "tiles", Tile), (b"^", "spikes", Spike), (b"B", "boosters", Booster)):
+            rows, cols = np.nonzero(cells == code[0])
+            statics[name] = [
+                sprite_class(Vector2((first_col + c) * TILE, (first_row + r) * TILE))
+                for r, c in zip(rows.tolist(), cols.tolist())
+            ]
+        for cell, col_idx, row_idx in self.chunk_entities.get(key, ()):
+            pos = Vector2(col_idx * TILE, row_idx * TILE)
+            if cell == "G":
+                statics["goal"].append(Goal(pos))
+                statics["teleporters"].append(Teleporter(pos))
+            elif cell == "T":
+                statics["teleporters"].append(Teleporter(pos))
+        layer = Surface(rect.size, pygame.SRCALPHA)
+        # Same bake order as Level.static_groups.
+        for name in ("tiles", "spikes"):
+            layer.blits([(sprite.image, sprite.rect.move(-rect.x, -rect.y)) for sprite in statics[name]], doreturn=False)
+        return LevelChunk(key, rect, statics, layer)
+
+    def activate(self, chunk):
+        if pygame.display.get_surface() is not None:
+            chunk.layer = chunk.layer.convert_alpha()
+        profiler.count("surface_allocs")
+        for name, sprites in chunk.statics.items():
+            getattr(self, name).add(*sprites)
+        for tile in chunk.statics["tiles"]:
+            self.solids.grid.insert(tile)
+        for name, grid in self.static_grids.items():
+            for sprite in chunk.statics[name]:
+                grid.insert(sprite)
+        self.chunks[chunk.key] = chunk
+        self.revision += 1
+
+        records = self.dormant.pop(chunk.key, None)
+        if records is None:
+            records = [(cell, col, row, None) for cell, col, row in self.chunk_entities.get(chunk.key, ()) if cell not in "GT"]
+        for cell, col, row, state in records:
+            for sprite in self.spawn_entity(cell, Vector2(col * TILE, row * TILE)):
+                if state is not None:
+                    sprite.set_state(state)
+                self.actor_origin[sprite] = (cell, col, row)
+                self.actor_order[sprite] = next(self.actor_counter)
+                self.actor_grids[sprite.groups()[0]].insert(sprite)
+
+    def take_actors(self, key, remove=False):
+        """Records for the live actors whose centre lies in chunk key, optionally removing them."""
+        records = []
+        for group in self.actor_groups():
+            for sprite in group.sprites():
+                if self.chunk_key(sprite.rect.center) != key:
+                    continue
+                state = sprite.get_state() if isinstance(sprite, StatefulSprite) else None
+                records.append((*self.actor_origin[sprite], state))
+                if remove:
+                    self.actor_grids[group].remove(sprite)
+                    sprite.kill()
+                    self.forget_actor(sprite)
+        return records
+
+    def forget_actor(self, sprite):
+        del self.actor_order[sprite]
+        del self.actor_origin[sprite]
+
+    def forget_dead_actors(self):
+        """Drop actors killed during play (collected, shot) from the grids and lookup tables."""
+        for grid in self.actor_grids.values():
+            for sprite in [sprite for sprite in grid.spans if not sprite.alive()]:
+                grid.remove(sprite)
+                self.forget_actor(sprite)
+
+    def evict(self, key):
+        chunk = self.chunks.pop(key)
+        self.revision += 1
+        for tile in chunk.statics["tiles"]:
+            self.solids.grid.remove(tile)
+        for name, grid in self.static_grids.items():
+            for sprite in chunk.statics[name]:
+                grid.remove(sprite)
+        for sprites in chunk.statics.values():
+            for sprite in sprites:
+                sprite.kill()
+        self.dormant[key] = self.take_actors(key, remove=True)
+        self.forget_dead_actors()
+
+    def stream(self, rect):
+        """Activate chunks near rect, prefetch the ring around them and evict the rest."""
+        # Chunks are only activated and evicted here, on the main thread, so a
+        # seeded run replays identically however fast the loader thread is.
+        margin = 2 * (self.ACTOR_CELL + TILE)
+        load_rect = rect.inflate(margin, margin)
+        wanted = self.chunk_keys(load_rect)
+        keep = set(self.chunk_keys(load_rect.inflate(2 * self.CHUNK_PX, 2 * self.CHUNK_PX)))
+        for key in [key for key in self.chunks if key not in keep]:
+            self.evict(key)
+        for key in [key for key in self.pending if key not in keep]:
+            self.pending.pop(key).cancel()
+        for key in wanted:
+            if key not in self.chunks:
+                future = self.pending.pop(key, None)
+                self.activate(future.result() if future else self.build_chunk(key))
+        for key in sorted(keep):
+            if key not in self.chunks and key not in self.pending:
+                self.pending[key] = self.loader().submit(self.build_chunk, key)
+
+    def snapshot(self):
+        """Actor records for every visited chunk; unvisited chunks spawn fresh from the map."""
+        chunks = {key: list(records) for key, records in self.dormant.items()}
+        for key in self.chunks:
+            chunks[key] = self.take_actors(key)
+        return {
+            "rng": self.rng.getstate(),
+            "chunks": chunks,
+            "boss": (self.boss, self.boss.get_state()) if self.boss else None,
+        }
+
+    def restore(self, snapshot):
+        """Unload every chunk and adopt the snapshot's records; the next stream() reloads."""
+        for key in list(self.chunks):
+            self.evict(key)
+        for group in self.actor_groups():
+            group.empty()
+        self.actor_order.clear()
+        self.actor_origin.clear()
+        self.index_actors()
+        self.dormant = {key: list(records) for key, records in snapshot["chunks"].items()}
+        self.rng.setstate(snapshot["rng"])
+        self.boss = None
+        if snapshot["boss"]:
+            self.boss, state = snapshot["boss"]
+            self.boss.set_state(state)
+
+    def static_blits(self, view):
+        # Each resident chunk carries its own baked layer.
+        return [
+            (chunk.layer, (chunk.rect.x - view.x, chunk.rect.y - view.y))
+            for chunk in self.chunks.values()
+            if chunk.rect.colliderect(view)
+        ]
 
-        for row_idx, row in enumerate(layout):
-            for col_idx, cell in enumerate(row):
-                pos = Vector2(col_idx * TILE, row_idx * TILE)
-                if cell == '#':
-                    self.tiles.add(Tile(pos))
-                elif cell == 'P':
-                    self.player_start = pos
-                elif cell == 'G':
-                    self.goal.add(Goal(pos))
-                    self.teleporters.add(Teleporter(pos))
-                elif cell == 'C':
-                    self.collectibles.add(Collectible(pos))
-                elif cell == 'S':
-                    self.shields.add(ShieldPickup(pos))
-                elif cell == 'E':
-                    self.enemies.add(Enemy(pos))
-                elif cell == 'H':
-                    self.hover_enemies.add(HoverEnemy(pos))
-                elif cell == 'R':
-                    self.flame_enemies.add(FlameStalker(pos))
-                elif cell == '^':
-                    self.spikes.add(Spike(pos))
-                elif cell == 'B':
-                    self.boosters.add(Booster(pos))
-                elif cell == 'M':
-                    self.moving_platforms.add(MovingPlatform(pos, axis="x"))
-                elif cell == 'V':
-                    self.moving_platforms.add(MovingPlatform(pos, axis="y"))
-                elif cell == 'L':
-                    self.lasers.add(LaserBarrier(pos))
-                elif cell == 'T':
-                    self.teleporters.add(Teleporter(pos))
-                elif cell == 'K':
-                    self.boss = Boss(pos)
+def build_level(layout, seed=None):
+    """Build a Level, or a ChunkedLevel when the map is too big to keep resident."""
+    data = layout if isinstance(layout, LevelData) else LevelData.from_layout(layout)
+    chunks = -(-data.cols // ChunkedLevel.CHUNK) * -(-data.rows // ChunkedLevel.CHUNK)
+    level_class = ChunkedLevel if chunks > ChunkedLevel.STREAM_MIN_CHUNKS else Level
+    return level_class(data, seed)
+
+class LevelList:
+    """The game's levels, each built from its layout the first time it is used."""
+
+    def __init__(self, layouts, seeds):
+        self.layouts = layouts
+        self.seeds = seeds
+        self.levels = [None] * len(layouts)
+
+    def __len__(self):
+        return len(self.levels)
+
+    def __getitem__(self, index):
+        level = self.levels[index]
+        if level is None:
+            index %= len(self.levels)
+            with startup_trace.phase(f"level {index + 1}"):
+                level = self.levels[index] = build_level(self.layouts[index], self.seeds[index])
+        return level
+
+class SoundScheduler:
+    """Plays each sound requested this frame at most once, within a voice budget keeping channels for priority cues."""
+
+    def __init__(self, channels=8, reserved=2):
+        pygame.mixer.set_num_channels(channels)
+        pygame.mixer.set_reserved(reserved)
+        self.reserved = [pygame.mixer.Channel(i) for i in range(reserved)]
+        self.limits = {}
+        self.pending = {}
+        self.played = 0
+        self.merged = 0
+        self.dropped = 0
+
+    def register(self, sound, max_voices=2, priority=False):
+        self.limits[sound] = (max_voices, priority)
+
+    def request(self, sound):
+        self.pending[sound] = self.pending.get(sound, 0) + 1
+
+    def channel_for(self, sound):
+        max_voices, priority = self.limits.get(sound, (2, False))
+        if sound.get_num_channels() >= max_voices:
+            return None
+        if priority:
+            for channel in self.reserved:
+                if not channel.get_busy():
+                    return channel
+        return pygame.mixer.find_channel()
+
+    def flush(self):
+        for sound, requests in self.pending.items():
+            if requests > 1:
+                self.merged += requests - 1
+                profiler.count("sfx_merged", requests - 1)
+            channel = self.channel_for(sound)
+            if channel is None:
+                self.dropped += 1
+                profiler.count("sfx_dropped")
+                continue
+            try:
+                channel.play(sound)
+                self.played += 1
+            except pygame.error:
+                pass
+        self.pending.clear()
+
+class MusicManager:
+    """Looping background music whose tracks are read on the loader thread and started by poll() once loaded."""
+
+    TRACKS = {
+        "boss": (("FFVII_Battle_ThemeV2.mp3",), ("*boss*",)),
+        "celebration": (
+            ("Goback.mp3", "Go back.mp3", "What we Do Here is Go Back - Otis McDonald.mp3"),
+            ("*go back*", "*celebrat*"),
+        ),
+    }
+    EXTENSIONS = (".ogg", ".mp3", ".wav")
+    paths = {}
+
+    def __init__(self, executor, enabled=True):
+        self.executor = executor
+        self.enabled = enabled
+        self.loads = {}
+        self.wanted = None
+        self.current = None
+        self.stream = None
+
+    @classmethod
+    def find(cls, track):
+        """Path of the first matching file next to the game, or None."""
+        if track not in cls.paths:
+            base = Path(__file__).parent
+            preferred, patterns = cls.TRACKS[track]
+            found = next((base / name for name in preferred if (base / name).exists()), None)
+            if found is None:
+                found = next(
+                    (
+                        candidate
+                        for ext in cls.EXTENSIONS
+                        for pattern in patterns
+                        for candidate in base.glob(f"{pattern}{ext}")
+                    ),
+                    None,
+                )
+            cls.paths[track] = str(found) if found else None
+        return cls.paths[track]
+
+    def preload(self, track):
+        path = self.find(track) if self.enabled else None
+        if path and path not in self.loads:
+            self.loads[path] = self.executor().submit(Path(path).read_bytes)
+        return path
+
+    def play(self, track):
+        """Loop the track from the start, as soon as it is loaded."""
+        path = self.preload(track)
+        if not path:
+            return
+        if path == self.current:
+            self.wanted = path
+            try:
+                pygame.mixer.music.play(-1)
+            except pygame.error:
+                pass
+            return
+        self.wanted = path
+        self.poll()
+
+    def stop(self):
+        self.wanted = None
+        self.current = None
+        if self.enabled:
+            try:
+                pygame.mixer.music.stop()
+            except pygame.error:
+                pass
+
+    def poll(self):
+        path = self.wanted
+        if path is None or path == self.current or not self.loads[path].done():
+            return
+        try:
+            # Keep a reference: the mixer reads from this buffer while it plays.
+            self.stream = io.BytesIO(self.loads[path].result())
+            pygame.mixer.music.load(self.stream, Path(path).suffix[1:])
+            pygame.mixer.music.play(-1)
+            self.current = path
+        except (OSError, pygame.error):
+            self.wanted = None
 
 class Game:
-    def __init__(self):
+    def __init__(self, headless=False, seed=None, profile_path=None, layouts=None, render_fps=FPS):
+        self.headless = headless
+        self.render_fps = render_fps
+        self.profile_path = profile_path
+        self.show_profiler = False
+        self.profiler_overlay = None
+        self.profiler_overlay_age = 0
+        self.profiler_font = None
+        if profile_path:
+            profiler.enabled = True
+            atexit.register(profiler.dump, profile_path)
+        self.seed = seed if seed is not None else random.randrange(1 << 32)
+        # Separate streams keep cosmetic effects (which only advance when a
+        # frame is drawn) from perturbing gameplay randomness.
+        self.gameplay_rng = random.Random(f"gameplay-{self.seed}")
+        self.cosmetic_rng = random.Random(f"cosmetic-{self.seed}")
+        self.fx_rng = np.random.default_rng([self.seed, 1])
+        self.sim_frames = 0
+        # Fixed-timestep state: leftover real time not yet simulated, the
+        # fraction of a tick it represents, and sprite positions before the
+        # last tick so drawing can blend between the two.
+        self.accumulator = 0.0
+        self.render_alpha = 1.0
+        self.previous_positions = {}
+        self.render_view = Rect(0, 0, WIDTH, HEIGHT)
         self.audio_enabled = False
-        pygame.init()
-        try:
-            pygame.mixer.init(frequency=44100, size=-16, channels=2)
-            self.audio_enabled = True
-        except pygame.error:
-            self.audio_enabled = False
-        pygame.display.set_caption("Python Platformer - 11 Levels")
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        if headless:
+            # The dummy drivers let display/key calls work on machines without
+            # a screen or sound card; nothing is ever presented.
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+        # Only the subsystems the game uses: pygame.init() would also open
+        # the audio device in headless runs and probe joysticks.
+        with startup_trace.phase("pygame"):
+            pygame.display.init()
+            pygame.font.init()
+        if not headless:
+            with startup_trace.phase("mixer"):
+                try:
+                    pygame.mixer.init(frequency=44100, size=-16, channels=2)
+                    self.audio_enabled = True
+                except pygame.error:
+                    self.audio_enabled = False
+        with startup_trace.phase("display"):
+            pygame.display.set_caption("Python Platformer - 11 Levels")
+            self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont("arial", 24)
-        self.big_font = pygame.font.SysFont("arial", 42, bold=True)
+        self.loader = None
+        # The system font scan runs on the loader thread while the rest of
+        # startup continues; headless runs only look fonts up if they draw.
+        self.loaded_fonts = None
+        self.pending_fonts = None if headless else self.asset_loader().submit(self.load_fonts)
 
         self.shoot_sound = None
         self.enemy_shoot_sound = None
         self.boss_volley_sound = None
         self.pickup_sound = None
+        self.pending_sounds = None
+        self.sfx = None
         if self.audio_enabled:
+            self.sfx = SoundScheduler()
             self.build_sounds()
 
-        self.levels = [Level(layout) for layout in load_levels()]
+        with startup_trace.phase("levels"):
+            layouts = layouts or load_levels()
+            self.levels = LevelList(layouts, [self.level_seed() for _ in layouts])
         self.boss_level_index = len(self.levels) - 2
         self.level_index = 0
         self.god_mode = False
         self.op_projectiles = False
         self.player = Player(self.levels[self.level_index].player_start, god_mode=self.god_mode)
-        self.player_projectiles = pygame.sprite.Group()
-        self.hazard_projectiles = pygame.sprite.Group()
+        self.input_source = NullInput() if headless else KeyboardInput()
+        self.player_projectiles = ProjectileField()
+        self.hazard_projectiles = ProjectileField()
         self.wave_enemies = pygame.sprite.Group()
-        self.trail = []
+        self.trail = ParticleSystem(64)
+        self.collisions = CollisionManager()
+        self.player_hurt = False
+        self.collisions.layer("collectibles", self.collect_gems)
+        self.collisions.layer("shields", self.collect_shields)
+        self.collisions.layer("boosters", self.launch_player)
+        for rank, name in enumerate(("enemies", "hover_enemies", "flame_enemies", "wave_enemies")):
+            self.collisions.layer(name, self.hurt_player, shot_rank=rank)
+        for name in ("spikes", "lasers"):
+            self.collisions.layer(name, self.hurt_player)
+        self.collisions.layer("hazard_shots", self.hurt_player, field=self.hazard_projectiles)
         self.state = "menu"
         self.selected_level = 0
+        # Menu dirty-rect state: the cached page, the baked backdrop and hills,
+        # and the star areas drawn last frame.
+        self.menu_page_key = None
+        self.menu_items = []
+        self.menu_backdrop = None
+        self.menu_backdrop_tick = None
+        self.menu_hills = None
+        self.menu_star_rects = []
+        self.level_boxes = {}
         self.transitioning = False
         self.finale_start_time = None
         self.finale_music_stopped = False
         self.story_start_time = None
-        self.stars = [
-            {
-                "pos": Vector2(random.randint(0, WIDTH), random.randint(0, HEIGHT)),
-                "radius": random.randint(1, 3),
-                "speed": random.uniform(0.15, 0.6),
-                "twinkle": random.uniform(0.5, 1.0),
-            }
-            for _ in range(80)
-        ]
+        self.stars = self.build_stars()
         self.embers = self.build_embers()
         self.nebulae = self.build_nebulae()
-        self.finale_fx = []
+        self.finale_fx = ParticleSystem(256)
         self.last_finale_fx = 0
-        self.boss_music_path = self.find_boss_music()
-        self.celebration_music_path = self.find_celebration_music()
+        self.glow_cache = GlowCache()
+        self.text_cache = TextCache()
+        self.hud_key = None
+        self.hud_items = []
+        self.music = MusicManager(self.asset_loader, self.audio_enabled)
         self.reset_level_state()
 
-    def build_sounds(self):
-        sample_rate = 44100
+    def level_seed(self):
+        return self.gameplay_rng.getrandbits(64)
 
-        def tone(freq, duration_ms=160, volume=0.35):
-            length = int(sample_rate * duration_ms / 1000)
-            buf = array.array("h")
-            for i in range(length):
-                value = int(volume * 32767 * math.sin(2 * math.pi * freq * (i / sample_rate)))
-                buf.append(value)
-            return pygame.mixer.Sound(buffer=buf.tobytes())
+    def state_digest(self):
+        """Hash of the gameplay state, for checking that replays stay bit-identical."""
+        level = self.levels[self.level_index]
+        player = self.player
+        state = [
+            self.level_index,
+            tuple(player.rect),
+            tuple(player.velocity),
+            player.health_bars,
+            player.damage_buffer,
+            player.shield_energy,
+            player.collected,
+            level.rng.getstate(),
+        ]
+        for group in (
+            level.enemies,
+            level.hover_enemies,
+            level.flame_enemies,
+            level.moving_platforms,
+            level.collectibles,
+            self.wave_enemies,
+        ):
+            state.append(tuple(tuple(sprite.rect) for sprite in group))
+        state.append(self.player_projectiles.rects())
+        state.append(self.hazard_projectiles.rects())
+        state.append(tuple(laser.timer for laser in level.lasers))
+        if level.boss:
+            state.append((tuple(level.boss.rect), level.boss.health))
+        return hashlib.sha1(repr(state).encode()).hexdigest()
+
+    def ticks(self):
+        """Milliseconds of game time, advanced only by simulation ticks."""
+        return self.sim_frames * 1000 // FPS
+
+    def render_ticks(self):
+        """Milliseconds for cosmetic animation: wall clock when live, game time when headless."""
+        if self.headless:
+            return self.ticks()
+        return pygame.time.get_ticks()
+
+    def build_sounds(self):
+        """Synthesise the sound effects on a worker thread; collect_sounds installs them once ready."""
+        frequency, _, channels = pygame.mixer.get_init()
+        self.pending_sounds = self.asset_loader().submit(self.synthesise_sounds, Synth(frequency, channels))
+
+    @staticmethod
+    def synthesise_sounds(synth):
+        with startup_trace.phase("sounds"):
+            return synth.build(SOUND_EFFECTS)
+
+    @staticmethod
+    def load_fonts():
+        with startup_trace.phase("fonts"):
+            return pygame.font.SysFont("arial", 24), pygame.font.SysFont("arial", 42, bold=True)
+
+    def ui_fonts(self):
+        if self.loaded_fonts is None:
+            pending, self.pending_fonts = self.pending_fonts, None
+            self.loaded_fonts = pending.result() if pending else self.load_fonts()
+        return self.loaded_fonts
+
+    @property
+    def font(self):
+        return self.ui_fonts()[0]
+
+    @property
+    def big_font(self):
+        return self.ui_fonts()[1]
+
+    def collect_sounds(self):
+        future = self.pending_sounds
+        if future is None or not future.done():
+            return
+        self.pending_sounds = None
+        for name, pcm in future.result().items():
+            sound = pygame.mixer.Sound(buffer=pcm)
+            self.sfx.register(sound, **SOUND_MIX.get(name, {}))
+            setattr(self, name, sound)
 
-        self.shoot_sound = tone(520, 120, 0.28)
-        self.enemy_shoot_sound = tone(300, 140, 0.22)
-        self.boss_volley_sound = tone(140, 200, 0.35)
-        self.pickup_sound = tone(760, 120, 0.3)
+    def asset_loader(self):
+        if self.loader is None:
+            self.loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="asset-loader")
+        return self.loader
 
     def play_sound(self, sound):
         if self.audio_enabled and sound:
-            try:
-                sound.play()
-            except pygame.error:
-                pass
-
-    def find_boss_music(self):
-        base = Path(__file__).parent
-        preferred = base / "FFVII_Battle_ThemeV2.mp3"
-        if preferred.exists():
-            return str(preferred)
-        for ext in (".ogg", ".mp3", ".wav"):
-            for candidate in base.glob(f"*boss*{ext}"):
-                return str(candidate)
-        return None
+            self.sfx.request(sound)
 
-    def find_celebration_music(self):
-        base = Path(__file__).parent
-        preferred_files = [
-            base / "Goback.mp3",
-            base / "Go back.mp3",
-            base / "What we Do Here is Go Back - Otis McDonald.mp3",
-        ]
-        for preferred in preferred_files:
-            if preferred.exists():
-                return str(preferred)
-        for ext in (".ogg", ".mp3", ".wav"):
-            for candidate in base.glob(f"*go back*{ext}"):
-                return str(candidate)
-            for candidate in base.glob(f"*celebrat*{ext}"):
-                return str(candidate)
-        return None
+    def build_stars(self, count=80):
+        stars = ParticleSystem(count)
+        for _ in range(count):
+            stars.spawn(
+                (self.cosmetic_rng.randint(0, WIDTH), self.cosmetic_rng.randint(0, HEIGHT)),
+                vel=(-self.cosmetic_rng.uniform(0.15, 0.6), 0),
+                size=self.cosmetic_rng.randint(1, 3),
+                phase=self.cosmetic_rng.uniform(0.5, 1.0),
+            )
+        return stars
 
     def build_embers(self, count=90):
-        embers = []
+        embers = ParticleSystem(count)
         for _ in range(count):
-            embers.append(
-                {
-                    "pos": Vector2(random.uniform(0, WIDTH), random.uniform(HEIGHT * 0.4, HEIGHT)),
-                    "vel": Vector2(random.uniform(-0.25, 0.25), random.uniform(-0.8, -0.3)),
-                    "size": random.randint(3, 9),
-                    "alpha": random.randint(120, 210),
-                }
+            embers.spawn(
+                (self.cosmetic_rng.uniform(0, WIDTH), self.cosmetic_rng.uniform(HEIGHT * 0.4, HEIGHT)),
+                vel=(self.cosmetic_rng.uniform(-0.25, 0.25), self.cosmetic_rng.uniform(-0.8, -0.3)),
+                size=self.cosmetic_rng.randint(3, 9),
+                alpha=self.cosmetic_rng.randint(120, 210),
             )
         return embers
 
     def build_nebulae(self, count=6):
-        blobs = []
+        blobs = ParticleSystem(count)
         for i in range(count):
-            blobs.append(
-                {
-                    "pos": Vector2(random.randint(0, WIDTH), random.randint(40, HEIGHT // 2)),
-                    "radius": random.randint(120, 210),
-                    "color": random.choice([(90, 120, 200), (140, 180, 255), (120, 90, 200)]),
-                    "offset": random.uniform(0.8, 1.6),
-                }
+            blobs.spawn(
+                (self.cosmetic_rng.randint(0, WIDTH), self.cosmetic_rng.randint(40, HEIGHT // 2)),
+                size=self.cosmetic_rng.randint(120, 210),
+                color=self.cosmetic_rng.choice([(90, 120, 200), (140, 180, 255), (120, 90, 200)]),
+                phase=self.cosmetic_rng.uniform(0.8, 1.6),
             )
         return blobs
 
@@ -909,8 +2572,8 @@ class Game:
         self.player.shield_regen_delay = 0
         self.player.shielding = False
         self.player.auto_walk_right = False
-        self.player_projectiles.empty()
-        self.hazard_projectiles.empty()
+        self.player_projectiles.clear()
+        self.hazard_projectiles.clear()
         self.wave_enemies.empty()
         self.boss_defeated = False
         self.boss_exit_timer = 0
@@ -924,87 +2587,167 @@ class Game:
         self.celebration_music_started = False
         self.finale_music_stopped = False
         self.embers = self.build_embers()
-        self.finale_fx = []
+        self.finale_fx.clear()
         self.last_finale_fx = 0
-        self.story_start_time = pygame.time.get_ticks() if self.level_index == len(self.levels) - 1 else None
-        # Deep copy collectibles to allow replaying levels
-        layout_copy = load_levels()[self.level_index]
-        self.levels[self.level_index] = Level(layout_copy)
-        self.player.rect.topleft = self.levels[self.level_index].player_start
-        if self.audio_enabled:
-            if self.level_index == self.boss_level_index:
-                if self.boss_music_path:
-                    try:
-                        pygame.mixer.music.load(self.boss_music_path)
-                        pygame.mixer.music.play(-1)
-                    except pygame.error:
-                        pass
-            else:
-                pygame.mixer.music.stop()
+        self.story_start_time = self.ticks() if self.level_index == len(self.levels) - 1 else None
+        # Restore pickups, enemies, lasers, platforms and the boss from the
+        # level's initial snapshot instead of rebuilding it from the text map.
+        level.reset()
+        self.camera = Camera((WIDTH, HEIGHT), level.size)
+        self.camera.follow(self.player.rect)
+        level.stream(self.camera.active)
+        if self.level_index == self.boss_level_index:
+            self.music.play("boss")
+        else:
+            self.music.stop()
+            if self.level_index == self.boss_level_index - 1:
+                self.music.preload("boss")
         self.transitioning = False
 
+    def blit(self, surface, dest, area=None):
+        profiler.count("blits")
+        return self.screen.blit(surface, dest, area)
+
+    def blit_many(self, blits):
+        profiler.count("blits", len(blits))
+        self.screen.blits(blits, doreturn=False)
+
+    def screen_rect(self, sprite):
+        """Where to draw a world sprite: blended between its last two ticks, relative to the render view."""
+        rect = sprite.rect
+        x, y = rect.topleft
+        alpha = self.render_alpha
+        previous = self.previous_positions.get(sprite)
+        # Anything that moved more than a tile in one tick was placed, not
+        # moved (respawns, teleports), so it is drawn where it is.
+        if previous is not None and alpha < 1 and abs(x - previous[0]) <= TILE and abs(y - previous[1]) <= TILE:
+            x = round(previous[0] + (x - previous[0]) * alpha)
+            y = round(previous[1] + (y - previous[1]) * alpha)
+        view = self.render_view
+        return Rect(x - view.x, y - view.y, rect.width, rect.height)
+
+    def draw_sprites(self, sprites):
+        """Blit world-space sprites through the camera."""
+        screen_rect = self.screen_rect
+        self.blit_many([(sprite.image, screen_rect(sprite)) for sprite in sprites])
+
+    def draw_group(self, group):
+        view = self.render_view
+        self.draw_sprites([sprite for sprite in group if view.colliderect(sprite.rect)])
+
+    def update_active(self, group, *args):
+        """Update the members of a culled level's group near the camera and re-file them in its grid."""
+        level = self.levels[self.level_index]
+        for sprite in level.in_rect(group, self.camera.active):
+            sprite.update(*args)
+            level.refile(group, sprite)
+
+    def render_text(self, font, text, color):
+        return self.text_cache.get(font, text, color)
+
     def draw_background(self):
+        prof = profiler
         if self.fire_mode:
-            draw_gradient_rect(self.screen, (70, 16, 10), (200, 70, 30), Rect(0, 0, WIDTH, HEIGHT))
-            base_glow = Surface((WIDTH, HEIGHT // 2), pygame.SRCALPHA)
-            draw_gradient_rect(base_glow, (220, 100, 50), (120, 40, 20), Rect(0, 0, WIDTH, HEIGHT // 2))
-            base_glow.set_alpha(150)
-            self.screen.blit(base_glow, (0, HEIGHT // 2))
-            for ember in self.embers:
-                ember["pos"] += ember["vel"]
-                if ember["pos"].y < -20:
-                    ember["pos"].y = HEIGHT + random.randint(0, 60)
-                    ember["pos"].x = random.uniform(0, WIDTH)
-                ember["pos"].x %= WIDTH
-                ember["alpha"] = max(80, min(220, ember["alpha"] + random.randint(-8, 8)))
-                size = ember["size"]
-                glow = Surface((size * 3, size * 3), pygame.SRCALPHA)
-                center = (int(size * 1.5), int(size * 1.5))
-                pygame.draw.circle(glow, (255, 200, 140, ember["alpha"]), center, size)
-                pygame.draw.circle(glow, (255, 120, 90, ember["alpha"] // 2), center, max(1, size // 2))
-                self.screen.blit(glow, (ember["pos"].x - size * 1.5, ember["pos"].y - size * 1.5))
-            for _ in range(6):
-                flicker_x = random.randint(0, WIDTH)
-                flicker_y = random.randint(0, HEIGHT // 2)
-                size = random.randint(80, 180)
-                flame = Surface((size, size), pygame.SRCALPHA)
-                pygame.draw.circle(flame, (255, 160, 90, 90), (size // 2, size // 2), size // 2)
-                self.screen.blit(flame, (flicker_x - size // 3, flicker_y))
-            for fx in self.finale_fx:
-                radius = fx.get("radius", 24)
-                surf = Surface((radius * 2, radius * 2), pygame.SRCALPHA)
-                color = fx.get("color", (255, 200, 140, 160))
-                pygame.draw.circle(surf, color, (radius, radius), radius)
-                pygame.draw.circle(surf, (255, 255, 255, 120), (radius, radius), max(8, radius // 2), 2)
-                self.screen.blit(surf, (fx["pos"].x - radius, fx["pos"].y - radius))
+            with prof.section("draw.sky"):
+                self.blit(get_gradient_surface((70, 16, 10), (200, 70, 30), (WIDTH, HEIGHT)), (0, 0))
+                base_glow = get_gradient_surface((220, 100, 50), (120, 40, 20), (WIDTH, HEIGHT // 2), alpha=150)
+                self.blit(base_glow, (0, HEIGHT // 2))
+            with prof.section("draw.embers"):
+                embers = self.embers
+                embers.step()
+                count = embers.count
+                pos = embers.pos[:count]
+                respawn = np.flatnonzero(pos[:, 1] < -20)
+                if len(respawn):
+                    pos[respawn, 1] = HEIGHT + self.fx_rng.integers(0, 61, len(respawn))
+                    pos[respawn, 0] = self.fx_rng.uniform(0, WIDTH, len(respawn))
+                pos[:, 0] %= WIDTH
+                alpha = embers.alpha[:count]
+                alpha += self.fx_rng.integers(-8, 9, count)
+                np.clip(alpha, 80, 220, out=alpha)
+                blits = []
+                for (x, y), size, ember_alpha in zip(pos.tolist(), embers.size[:count].tolist(), alpha.tolist()):
+                    size = int(size)
+                    glow = self.glow_cache.get(
+                        size, (255, 200, 140), ember_alpha, (255, 120, 90), max(1, size // 2), ember_alpha // 2
+                    )
+                    blits.append((glow, (x - size, y - size)))
+                self.blit_many(blits)
+            with prof.section("draw.flames"):
+                for _ in range(6):
+                    flicker_x = self.cosmetic_rng.randint(0, WIDTH)
+                    flicker_y = self.cosmetic_rng.randint(0, HEIGHT // 2)
+                    size = self.cosmetic_rng.randint(80, 180)
+                    flame = self.glow_cache.get(size // 2, (255, 160, 90), 90)
+                    self.blit(flame, (flicker_x - size // 3, flicker_y))
+            with prof.section("draw.finale_fx"):
+                fx = self.finale_fx
+                count = fx.count
+                for (x, y), radius, color, fx_alpha in zip(
+                    fx.pos[:count].tolist(), fx.size[:count].tolist(), fx.color[:count].tolist(), fx.alpha[:count].tolist()
+                ):
+                    radius = int(radius)
+                    surf = self.glow_cache.get(radius, tuple(color), fx_alpha, (255, 255, 255), max(8, radius // 2), 120, 2)
+                    self.blit(surf, (x - radius, y - radius))
         else:
-            draw_gradient_rect(self.screen, (15, 18, 45), (35, 45, 80), Rect(0, 0, WIDTH, HEIGHT))
-            for blob in self.nebulae:
-                wobble = math.sin(pygame.time.get_ticks() / 1000 * blob["offset"]) * 14
-                surf = Surface((blob["radius"] * 2, blob["radius"] * 2), pygame.SRCALPHA)
-                pygame.draw.circle(surf, (*blob["color"], 42), (blob["radius"], blob["radius"]), blob["radius"])
-                pygame.draw.circle(surf, (*blob["color"], 90), (blob["radius"], blob["radius"]), blob["radius"] // 2)
-                self.screen.blit(surf, (blob["pos"].x - blob["radius"] + wobble, blob["pos"].y - blob["radius"] * 0.6))
-            for star in self.stars:
-                star["pos"].x -= star["speed"]
-                if star["pos"].x < 0:
-                    star["pos"].x = WIDTH
-                    star["pos"].y = random.randint(0, HEIGHT)
-                twinkle = 150 + int(80 * abs(pygame.time.get_ticks() % 1200 - 600) / 600)
-                color = (twinkle, twinkle, 255)
-                pygame.draw.circle(self.screen, color, (int(star["pos"].x), int(star["pos"].y)), star["radius"])
-            parallax_color = (60, 80, 130)
-            for i in range(6):
-                pygame.draw.polygon(
-                    self.screen,
-                    (parallax_color[0], parallax_color[1], parallax_color[2] + i * 4),
-                    [
-                        (i * 180 - 120, HEIGHT - 200 + i * 10),
-                        (i * 180 + 80, HEIGHT - 260 + i * 8),
-                        (i * 180 + 200, HEIGHT - 200 + i * 10),
-                    ],
-                    0,
-                )
+            with prof.section("draw.sky"):
+                self.blit(get_gradient_surface((15, 18, 45), (35, 45, 80), (WIDTH, HEIGHT)), (0, 0))
+            with prof.section("draw.nebulae"):
+                self.draw_nebulae(self.screen)
+            with prof.section("draw.stars"):
+                stars, color = self.step_stars()
+                for center, radius in stars:
+                    pygame.draw.circle(self.screen, color, center, radius)
+            with prof.section("draw.parallax"):
+                self.draw_parallax(self.screen)
+
+    def draw_nebulae(self, surface):
+        nebulae = self.nebulae
+        count = nebulae.count
+        seconds = self.render_ticks() / 1000
+        blits = []
+        for (x, y), radius, color, offset in zip(
+            nebulae.pos[:count].tolist(),
+            nebulae.size[:count].tolist(),
+            nebulae.color[:count].tolist(),
+            nebulae.phase[:count].tolist(),
+        ):
+            wobble = math.sin(seconds * offset) * 14
+            radius = int(radius)
+            color = tuple(color)
+            surf = self.glow_cache.get(radius, color, 42, color, radius // 2, 90)
+            blits.append((surf, (x - radius + wobble, y - radius * 0.6)))
+        profiler.count("blits", len(blits))
+        surface.blits(blits, doreturn=False)
+
+    def step_stars(self):
+        """Advance the starfield; returns its (centre, radius) pairs and the current twinkle colour."""
+        stars = self.stars
+        stars.step()
+        count = stars.count
+        pos = stars.pos[:count]
+        wrapped = np.flatnonzero(pos[:, 0] < 0)
+        if len(wrapped):
+            pos[wrapped, 0] = WIDTH
+            pos[wrapped, 1] = self.fx_rng.integers(0, HEIGHT + 1, len(wrapped))
+        twinkle = 150 + int(80 * abs(self.render_ticks() % 1200 - 600) / 600)
+        centers = pos.astype(int).tolist()
+        return list(zip(centers, stars.size[:count].astype(int).tolist())), (twinkle, twinkle, 255)
+
+    @staticmethod
+    def draw_parallax(surface):
+        parallax_color = (60, 80, 130)
+        for i in range(6):
+            pygame.draw.polygon(
+                surface,
+                (parallax_color[0], parallax_color[1], parallax_color[2] + i * 4),
+                [
+                    (i * 180 - 120, HEIGHT - 200 + i * 10),
+                    (i * 180 + 80, HEIGHT - 260 + i * 8),
+                    (i * 180 + 200, HEIGHT - 200 + i * 10),
+                ],
+                0,
+            )
 
     def handle_events(self):
         for event in pygame.event.get():
@@ -1019,60 +2762,50 @@ class Game:
     def trigger_finale(self, level):
         self.boss_defeated = True
         self.boss_exit_timer = 0
-        self.finale_start_time = pygame.time.get_ticks()
+        self.finale_start_time = self.ticks()
         self.finale_music_stopped = False
         self.allow_exit = False
         self.fire_mode = True
         if level.boss:
             level.boss.start_death()
-        self.hazard_projectiles.empty()
-        if self.audio_enabled:
-            pygame.mixer.music.stop()
+        self.hazard_projectiles.clear()
+        self.music.stop()
 
     def start_celebration_music(self):
-        if self.audio_enabled and self.celebration_music_path and not self.celebration_music_started:
-            try:
-                pygame.mixer.music.load(self.celebration_music_path)
-                pygame.mixer.music.play(-1)
-                self.celebration_music_started = True
-            except pygame.error:
-                pass
+        if not self.celebration_music_started:
+            self.music.play("celebration")
+            self.celebration_music_started = True
 
     def stop_music(self):
-        if self.audio_enabled:
-            try:
-                pygame.mixer.music.stop()
-            except pygame.error:
-                pass
+        self.music.stop()
 
     def update_finale_fx(self, elapsed):
         if self.fire_mode and elapsed - self.last_finale_fx > 420:
             self.last_finale_fx = elapsed
-            bursts = random.randint(2, 4)
+            bursts = self.cosmetic_rng.randint(2, 4)
             for _ in range(bursts):
-                self.finale_fx.append(
-                    {
-                        "pos": Vector2(random.randint(0, WIDTH), random.randint(HEIGHT // 3, HEIGHT - 80)),
-                        "vel": Vector2(random.uniform(-0.3, 0.3), random.uniform(-0.6, -0.2)),
-                        "radius": random.randint(18, 34),
-                        "life": random.randint(40, 80),
-                        "color": (255, random.randint(170, 230), random.randint(120, 180), random.randint(120, 180)),
-                    }
+                self.finale_fx.spawn(
+                    (self.cosmetic_rng.randint(0, WIDTH), self.cosmetic_rng.randint(HEIGHT // 3, HEIGHT - 80)),
+                    vel=(self.cosmetic_rng.uniform(-0.3, 0.3), self.cosmetic_rng.uniform(-0.6, -0.2)),
+                    size=self.cosmetic_rng.randint(18, 34),
+                    life=self.cosmetic_rng.randint(40, 80),
+                    color=(255, self.cosmetic_rng.randint(170, 230), self.cosmetic_rng.randint(120, 180)),
+                    alpha=self.cosmetic_rng.randint(120, 180),
                 )
-        for fx in self.finale_fx:
-            fx["pos"] += fx.get("vel", Vector2(0, -0.3))
-            fx["life"] -= 1
-        self.finale_fx = [fx for fx in self.finale_fx if fx["life"] > 0]
+        self.finale_fx.step()
+        self.finale_fx.age()
 
     def spawn_wave_enemies(self, level):
         floor_top = min(tile.rect.top for tile in level.tiles) if level.tiles else HEIGHT - TILE * 2
         base_y = floor_top - int(TILE * 0.9)
-        positions = [120, 260, 420, 580, 740]
+        # The original screen-wide spacing, stretched across the whole arena.
+        width = level.size[0]
+        positions = [x * width // WIDTH for x in (120, 260, 420, 580, 740)]
         for x in positions:
-            self.wave_enemies.add(GroundShooter((x, base_y)))
+            self.wave_enemies.add(GroundShooter((x, base_y), level.rng))
 
     def handle_finale_sequence(self, level):
-        now = pygame.time.get_ticks()
+        now = self.ticks()
         if self.finale_start_time is None:
             self.finale_start_time = now
         elapsed = now - self.finale_start_time
@@ -1105,70 +2838,125 @@ class Game:
             self.epilogue_ready = True
             self.allow_exit = True
 
+    def fill_collisions(self, level):
+        """Hand the collision manager everything the player or their shots could touch this tick."""
+        collisions = self.collisions
+        source = (level, level.revision)
+        if source != collisions.source:
+            # Pickups, spikes and boosters never move, so they are only re-filed
+            # when the level loads or unloads sprites.
+            collisions.place(
+                source,
+                (
+                    ("collectibles", level.collectibles),
+                    ("shields", level.shields),
+                    ("boosters", level.boosters),
+                    ("spikes", level.spikes),
+                ),
+            )
+        # Shots only live inside the view, so actors around the view (and the
+        # player, should they have left it) are all that can be hit.
+        groups = (level.lasers, level.enemies, level.hover_enemies, level.flame_enemies)
+        lasers, enemies, hover_enemies, flame_enemies = level.near(self.player.rect.union(self.camera.view), groups)
+        collisions.fill(
+            (
+                ("enemies", enemies),
+                ("hover_enemies", hover_enemies),
+                ("flame_enemies", flame_enemies),
+                ("lasers", [laser for laser in lasers if laser.active]),
+                ("wave_enemies", self.wave_enemies.sprites()),
+            )
+        )
+
+    def collect_gems(self, gems):
+        for gem in gems:
+            gem.kill()
+        self.player.collected += len(gems)
+        self.play_sound(self.pickup_sound)
+
+    def collect_shields(self, pickups):
+        for pickup in pickups:
+            pickup.kill()
+        self.player.shield_time = 900
+        self.player.shield_energy = self.player.shield_energy_max
+        self.player.shield_break_timer = 0
+        self.player.shield_regen_delay = 0
+        self.play_sound(self.pickup_sound)
+
+    def launch_player(self, boosters):
+        self.player.velocity.y = JUMP_FORCE * 1.2
+        self.player.on_ground = False
+
+    def hurt_player(self, hazards):
+        self.player_hurt = True
+
     def update_player_state(self, level):
-        level.moving_platforms.update()
-        level.lasers.update()
-        collision_tiles = list(level.tiles) + list(level.moving_platforms)
-        level.enemies.update(collision_tiles)
-        level.hover_enemies.update(collision_tiles, self.hazard_projectiles, self.play_sound, self.enemy_shoot_sound)
-        level.flame_enemies.update(collision_tiles, self.hazard_projectiles, self.player, self.play_sound, self.enemy_shoot_sound)
-        self.wave_enemies.update(collision_tiles, self.hazard_projectiles, self.play_sound, self.enemy_shoot_sound, self.player)
-        player_projectile = self.player.update(collision_tiles)
-        if player_projectile:
-            self.player_projectiles.add(player_projectile)
-            self.play_sound(self.shoot_sound)
-
-        self.player_projectiles.update()
-        self.hazard_projectiles.update()
+        prof = profiler
+        # Whole levels update every actor; culled ones only those near the camera.
+        update = self.update_active if level.culled else pygame.sprite.Group.update
+        with prof.section("update.platforms"):
+            update(level.moving_platforms)
+        with prof.section("update.lasers"):
+            update(level.lasers)
+        collision_tiles = level.solids
+        with prof.section("update.enemies"):
+            update(level.enemies, collision_tiles)
+        with prof.section("update.hover_enemies"):
+            update(
+                level.hover_enemies, collision_tiles, self.hazard_projectiles, self.play_sound, self.enemy_shoot_sound
+            )
+        with prof.section("update.flame_enemies"):
+            update(
+                level.flame_enemies,
+                collision_tiles,
+                self.hazard_projectiles,
+                self.player,
+                self.play_sound,
+                self.enemy_shoot_sound,
+            )
+        with prof.section("update.wave_enemies"):
+            self.wave_enemies.update(
+                collision_tiles, self.hazard_projectiles, self.play_sound, self.enemy_shoot_sound, self.player
+            )
+        with prof.section("update.player"):
+            shot = self.player.update(collision_tiles, self.input_source)
+            if shot:
+                self.player_projectiles.spawn(**shot)
+                self.play_sound(self.shoot_sound)
+            self.camera.follow(self.player.rect)
+        with prof.section("update.stream"):
+            level.stream(self.camera.active)
+
+        with prof.section("update.projectiles"):
+            self.player_projectiles.step(self.camera.view)
+            self.hazard_projectiles.step(self.camera.view)
 
         # Finale sequencing runs every frame once the boss is beaten, even if the
         # player takes damage, so the post-fight celebration can't stall.
         if self.boss_defeated:
-            self.handle_finale_sequence(level)
-
-        speed = abs(self.player.velocity.x) + abs(self.player.velocity.y)
-        if speed > 2:
-            self.trail.append({"pos": self.player.rect.center, "life": 18})
-        for particle in self.trail:
-            particle["life"] -= 1
-        self.trail = [p for p in self.trail if p["life"] > 0]
-
-        # Collectibles
-        collected = pygame.sprite.spritecollide(self.player, level.collectibles, dokill=True)
-        self.player.collected += len(collected)
-        if collected:
-            self.play_sound(self.pickup_sound)
-
-        shield_pickups = pygame.sprite.spritecollide(self.player, level.shields, dokill=True)
-        if shield_pickups:
-            self.player.shield_time = 900
-            self.player.shield_energy = self.player.shield_energy_max
-            self.player.shield_break_timer = 0
-            self.player.shield_regen_delay = 0
-            self.play_sound(self.pickup_sound)
-
-        # Boosters
-        if pygame.sprite.spritecollideany(self.player, level.boosters):
-            self.player.velocity.y = JUMP_FORCE * 1.2
-            self.player.on_ground = False
-
-        # Hazards and enemies
-        laser_hit = any(laser.active and laser.rect.colliderect(self.player.rect) for laser in level.lasers)
-        hurtful = (
-            pygame.sprite.spritecollideany(self.player, level.spikes)
-            or pygame.sprite.spritecollideany(self.player, level.enemies)
-            or pygame.sprite.spritecollideany(self.player, level.hover_enemies)
-            or pygame.sprite.spritecollideany(self.player, level.flame_enemies)
-            or pygame.sprite.spritecollideany(self.player, self.wave_enemies)
-            or pygame.sprite.spritecollideany(self.player, self.hazard_projectiles)
-            or laser_hit
-        )
-        if self.boss_defeated and not self.wave_spawned:
-            # Keep the player safe during the celebration so the finale timers
-            # reliably reach the encore phase.
-            hurtful = False
-        if self.god_mode:
-            hurtful = False
+            with prof.section("update.finale"):
+                self.handle_finale_sequence(level)
+
+        with prof.section("update.trail"):
+            speed = abs(self.player.velocity.x) + abs(self.player.velocity.y)
+            if speed > 2:
+                self.trail.spawn(self.player.rect.center, life=18)
+            self.trail.age()
+
+        with prof.section("update.collisions"):
+            # Handlers fire in layer registration order (pickups, boosters, then
+            # hazards); shot hits on enemies are held until after the boss has
+            # taken its share.
+            self.player_hurt = False
+            self.fill_collisions(level)
+            self.collisions.run(self.player.rect, self.player_projectiles)
+            hurtful = self.player_hurt
+            if self.boss_defeated and not self.wave_spawned:
+                # Keep the player safe during the celebration so the finale timers
+                # reliably reach the encore phase.
+                hurtful = False
+            if self.god_mode:
+                hurtful = False
         if hurtful:
             if self.player.absorb_hit():
                 return
@@ -1179,33 +2967,44 @@ class Game:
 
         # Boss logic
         if level.boss:
-            level.boss.update(collision_tiles, self.player, self.hazard_projectiles, self.boss_volley_sound, self.play_sound)
-            if pygame.sprite.collide_rect(self.player, level.boss) and not self.god_mode:
-                alive = self.player.register_hit()
-                if not alive:
-                    self.reset_level_state()
-                return
-            boss_hits = pygame.sprite.spritecollide(level.boss, self.player_projectiles, dokill=True)
-            if boss_hits:
-                total_damage = sum(getattr(hit, "damage", 1) for hit in boss_hits)
-                level.boss.take_hit(total_damage)
-                self.play_sound(self.enemy_shoot_sound)
-            if level.boss.health <= 0:
-                if self.level_index == self.boss_level_index:
-                    self.trigger_finale(level)
-                else:
-                    self.advance_level()
-                return
+            with prof.section("update.boss"):
+                level.boss.update(
+                    collision_tiles,
+                    self.player,
+                    self.hazard_projectiles,
+                    self.boss_volley_sound,
+                    self.play_sound,
+                    self.camera.view,
+                )
+                if pygame.sprite.collide_rect(self.player, level.boss) and not self.god_mode:
+                    alive = self.player.register_hit()
+                    if not alive:
+                        self.reset_level_state()
+                    return
+                boss_hits = self.player_projectiles.hits(level.boss.rect)
+                if boss_hits is not None:
+                    total_damage = int(self.player_projectiles.damage[: len(boss_hits)][boss_hits].sum())
+                    self.player_projectiles.remove(boss_hits)
+                    self.collisions.forget_shots(boss_hits)
+                    level.boss.take_hit(total_damage)
+                    self.play_sound(self.enemy_shoot_sound)
+                    if level.boss.health <= CELEBRATION_PRELOAD_HP and self.level_index == self.boss_level_index:
+                        self.music.preload("celebration")
+                if level.boss.health <= 0:
+                    if self.level_index == self.boss_level_index:
+                        self.trigger_finale(level)
+                    else:
+                        self.advance_level()
+                    return
         elif self.level_index == self.boss_level_index and not self.boss_defeated:
             # If the boss despawns unexpectedly, still start the finale so the
             # sequence always runs on the boss level.
             self.trigger_finale(level)
 
         # Player shots damage enemies
-        pygame.sprite.groupcollide(self.player_projectiles, level.enemies, True, True)
-        pygame.sprite.groupcollide(self.player_projectiles, level.hover_enemies, True, True)
-        pygame.sprite.groupcollide(self.player_projectiles, level.flame_enemies, True, True)
-        pygame.sprite.groupcollide(self.player_projectiles, self.wave_enemies, True, True)
+        with prof.section("update.shots"):
+            for enemy in self.collisions.resolve_shots(self.player_projectiles):
+                enemy.kill()
 
         # Goal (inactive while boss lives)
         if level.boss and level.boss.health > 0:
@@ -1231,12 +3030,16 @@ class Game:
         if self.level_index < len(self.levels) - 1:
             self.level_index += 1
             self.reset_level_state()
+        elif self.headless:
+            # No one can press R on the victory screen, so wrap straight back.
+            self.level_index = 0
+            self.reset_level_state()
         else:
             self.show_victory_screen()
         self.transitioning = False
 
     def show_victory_screen(self):
-        message = self.font.render("You cleared all 11 levels! Press R to replay.", True, (255, 255, 255))
+        message = self.render_text(self.font, "You cleared all 11 levels! Press R to replay.", (255, 255, 255))
         while True:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -1248,152 +3051,269 @@ class Game:
                     return
 
             self.screen.fill((10, 10, 10))
-            self.screen.blit(message, message.get_rect(center=(WIDTH // 2, HEIGHT // 2)))
+            self.blit(message, message.get_rect(center=(WIDTH // 2, HEIGHT // 2)))
             pygame.display.flip()
             self.clock.tick(30)
 
     def draw_level(self, level):
-        level.tiles.draw(self.screen)
-        level.spikes.draw(self.screen)
-        level.moving_platforms.draw(self.screen)
-        level.collectibles.draw(self.screen)
-        level.shields.draw(self.screen)
-        level.teleporters.draw(self.screen)
-        level.goal.draw(self.screen)
-        level.enemies.draw(self.screen)
-        level.hover_enemies.draw(self.screen)
-        level.flame_enemies.draw(self.screen)
-        level.boosters.draw(self.screen)
-        level.lasers.draw(self.screen)
-        self.wave_enemies.draw(self.screen)
-        for particle in self.trail:
-            alpha = max(40, particle["life"] * 7)
-            radius = max(4, particle["life"] // 2)
-            glow = Surface((radius * 2, radius * 2), pygame.SRCALPHA)
-            pygame.draw.circle(glow, (120, 180, 255, alpha), (radius, radius), radius)
-            pygame.draw.circle(glow, (255, 255, 255, alpha), (radius, radius), radius // 2)
-            pos = (particle["pos"][0] - radius, particle["pos"][1] - radius)
-            self.screen.blit(glow, pos)
-        self.player_projectiles.draw(self.screen)
-        self.hazard_projectiles.draw(self.screen)
+        prof = profiler
+        camera = self.camera
+        self.render_view = view = camera.interpolated(self.render_alpha)
+        with prof.section("draw.static"):
+            self.blit_many(level.static_blits(view))
+        with prof.section("draw.sprites"):
+            # Static groups that aren't baked keep their original slots in this order.
+            for group in (
+                level.moving_platforms,
+                level.collectibles,
+                level.shields,
+                level.teleporters,
+                level.goal,
+                level.enemies,
+                level.hover_enemies,
+                level.flame_enemies,
+                level.boosters,
+                level.lasers,
+            ):
+                if level.culled and group in level.actor_grids:
+                    self.draw_sprites(level.in_rect(group, camera.view))
+                else:
+                    self.draw_group(group)
+            self.draw_group(self.wave_enemies)
+        with prof.section("draw.trail"):
+            trail = self.trail
+            life = trail.life[: trail.count].astype(int)
+            alphas = np.maximum(40, life * 7).tolist()
+            radii = np.maximum(4, life // 2).tolist()
+            screen_pos = trail.pos[: trail.count] - view.topleft
+            blits = []
+            for (x, y), alpha, radius in zip(screen_pos.tolist(), alphas, radii):
+                glow = self.glow_cache.get(radius, (120, 180, 255), alpha, (255, 255, 255), radius // 2)
+                blits.append((glow, (x - radius, y - radius)))
+            self.blit_many(blits)
+        with prof.section("draw.projectiles"):
+            for shots in (self.player_projectiles, self.hazard_projectiles):
+                self.blit_many(shots.blits(view, self.render_alpha))
         if level.boss:
-            self.screen.blit(level.boss.image, level.boss.rect)
+            self.blit(level.boss.image, self.screen_rect(level.boss))
         if self.fire_mode:
-            flame = Surface((WIDTH, TILE * 2), pygame.SRCALPHA)
-            for i in range(10):
-                start_x = i * 120 + random.randint(-20, 20)
-                flame_height = random.randint(60, 140)
-                pygame.draw.polygon(
-                    flame,
-                    (255, 120, 60, 120),
-                    [
-                        (start_x, TILE * 2),
-                        (start_x + 80, TILE * 2),
-                        (start_x + 40, TILE * 2 - flame_height),
-                    ],
-                )
-            self.screen.blit(flame, (0, HEIGHT - TILE * 2))
-        if self.player.shield_time > 0 or self.player.invuln_timer > 0:
-            aura_size = TILE * 1.4
-            aura = Surface((aura_size, aura_size), pygame.SRCALPHA)
-            alpha = 160 if self.player.shield_time > 0 else 90
-            pygame.draw.circle(aura, (120, 220, 255, alpha), (aura_size // 2, aura_size // 2), aura_size // 2)
-            rect = aura.get_rect(center=self.player.rect.center)
-            self.screen.blit(aura, rect)
-        if self.player_dancing:
-            angle = math.sin(pygame.time.get_ticks() / 180) * 14
-            rotated = pygame.transform.rotate(self.player.image, angle)
-            rect = rotated.get_rect(center=self.player.rect.center)
-            self.screen.blit(rotated, rect)
-        else:
-            self.screen.blit(self.player.image, self.player.rect)
+            with prof.section("draw.ground_fire"):
+                flame = Surface((WIDTH, TILE * 2), pygame.SRCALPHA)
+                prof.count("surface_allocs")
+                for i in range(10):
+                    start_x = i * 120 + self.cosmetic_rng.randint(-20, 20)
+                    flame_height = self.cosmetic_rng.randint(60, 140)
+                    pygame.draw.polygon(
+                        flame,
+                        (255, 120, 60, 120),
+                        [
+                            (start_x, TILE * 2),
+                            (start_x + 80, TILE * 2),
+                            (start_x + 40, TILE * 2 - flame_height),
+                        ],
+                    )
+                self.blit(flame, (0, HEIGHT - TILE * 2))
+        with prof.section("draw.player"):
+            player_rect = self.screen_rect(self.player)
+            if self.player.shield_time > 0 or self.player.invuln_timer > 0:
+                alpha = 160 if self.player.shield_time > 0 else 90
+                aura = self.glow_cache.get(int(TILE * 1.4) // 2, (120, 220, 255), alpha)
+                rect = aura.get_rect(center=player_rect.center)
+                self.blit(aura, rect)
+            if self.player_dancing:
+                angle = math.sin(self.render_ticks() / 180) * 14
+                rotated = pygame.transform.rotate(self.player.image, angle)
+                prof.count("surface_allocs")
+                rect = rotated.get_rect(center=player_rect.center)
+                self.blit(rotated, rect)
+            else:
+                self.blit(self.player.image, player_rect)
 
-    def draw_hud(self, level):
-        info = f"Level {self.level_index + 1}/{len(self.levels)} | Gems: {self.player.collected}" \
-               f" | Reset: R | Quit: ESC"
-        text_surface = self.font.render(info, True, (240, 240, 240))
-        self.screen.blit(text_surface, (20, 20))
-        guide = self.font.render("Move: A/D or ←/→, Jump: W/SPACE/↑, Shoot: E, Shield: F", True, (200, 200, 220))
-        self.screen.blit(guide, (20, 50))
-
-        shield_bar_back = pygame.Rect(20, 80, 220, 16)
-        pygame.draw.rect(self.screen, (40, 60, 90), shield_bar_back, border_radius=6)
-        shield_ratio = self.player.shield_energy / self.player.shield_energy_max
-        shield_bar = pygame.Rect(20, 80, int(220 * shield_ratio), 16)
-        color = (120, 230, 255) if self.player.shielding else (80, 160, 220)
-        pygame.draw.rect(self.screen, color, shield_bar, border_radius=6)
-        pygame.draw.rect(self.screen, (210, 230, 255), shield_bar_back, 2, border_radius=6)
-        shield_label = "Shielding" if self.player.shielding else "Shield"
-        if self.player.shield_break_timer > 0:
+    def hud_state(self, level):
+        """Everything the HUD shows; its cached items are rebuilt only when this changes."""
+        player = self.player
+        shield_label = "Shielding" if player.shielding else "Shield"
+        if player.shield_break_timer > 0:
             shield_label = "Shield broken"
-        elif self.player.invuln_timer > 0:
+        elif player.invuln_timer > 0:
             shield_label = "Shield recovering"
-        shield_text = self.font.render(f"{shield_label} (F)", True, (200, 230, 255))
-        self.screen.blit(shield_text, (20, 60))
-
-        health_text = self.font.render("Health", True, (255, 210, 210))
-        self.screen.blit(health_text, (20, 102))
-        for i in range(self.player.max_health_bars):
-            bar_rect = pygame.Rect(20 + i * 46, 122, 40, 14)
-            pygame.draw.rect(self.screen, (70, 40, 40), bar_rect, border_radius=4)
+        story = (
+            self.level_index == len(self.levels) - 1
+            and self.story_start_time is not None
+            and self.ticks() - self.story_start_time < 7000
+        )
+        return (
+            self.level_index,
+            player.collected,
+            shield_label,
+            int(220 * player.shield_energy / player.shield_energy_max),
+            player.shielding,
+            player.max_health_bars,
+            player.health_bars,
+            player.damage_buffer > 0,
+            level.boss.health if level.boss else None,
+            self.player_dancing,
+            self.wave_spawned and not self.epilogue_ready,
+            self.epilogue_ready,
+            story,
+            self.god_mode,
+        )
+
+    def draw_hud(self, level):
+        state = self.hud_state(level)
+        if state != self.hud_key:
+            self.hud_key = state
+            self.hud_items = self.build_hud(*state)
+        self.blit_many(self.hud_items)
+
+    def build_hud(
+        self,
+        level_index,
+        collected,
+        shield_label,
+        shield_width,
+        shielding,
+        max_health_bars,
+        health_bars,
+        half_bar,
+        boss_health,
+        dancing,
+        wave_active,
+        epilogue_ready,
+        story,
+        god_mode,
+    ):
+        """Render the HUD for one state into (surface, position) items, back to front."""
+        items = []
+        info = f"Level {level_index + 1}/{len(self.levels)} | Gems: {collected} | Reset: R | Quit: ESC"
+        items.append((self.render_text(self.font, info, (240, 240, 240)), (20, 20)))
+        guide = self.render_text(self.font, "Move: A/D or ←/→, Jump: W/SPACE/↑, Shoot: E, Shield: F", (200, 200, 220))
+        items.append((guide, (20, 50)))
+
+        shield_bar = Surface((220, 16), pygame.SRCALPHA)
+        profiler.count("surface_allocs")
+        pygame.draw.rect(shield_bar, (40, 60, 90), shield_bar.get_rect(), border_radius=6)
+        color = (120, 230, 255) if shielding else (80, 160, 220)
+        pygame.draw.rect(shield_bar, color, Rect(0, 0, shield_width, 16), border_radius=6)
+        pygame.draw.rect(shield_bar, (210, 230, 255), shield_bar.get_rect(), 2, border_radius=6)
+        items.append((shield_bar, (20, 80)))
+        items.append((self.render_text(self.font, f"{shield_label} (F)", (200, 230, 255)), (20, 60)))
+
+        items.append((self.render_text(self.font, "Health", (255, 210, 210)), (20, 102)))
+        health_bar = Surface((max_health_bars * 46, 14), pygame.SRCALPHA)
+        profiler.count("surface_allocs")
+        for i in range(max_health_bars):
+            bar_rect = Rect(i * 46, 0, 40, 14)
+            pygame.draw.rect(health_bar, (70, 40, 40), bar_rect, border_radius=4)
             fill_ratio = 0
-            if i < self.player.health_bars:
+            if i < health_bars:
                 fill_ratio = 1
-            elif i == self.player.health_bars and self.player.damage_buffer > 0:
+            elif i == health_bars and half_bar:
                 fill_ratio = 0.5
             if fill_ratio > 0:
-                fill_rect = pygame.Rect(bar_rect.x, bar_rect.y, int(bar_rect.width * fill_ratio), bar_rect.height)
-                pygame.draw.rect(self.screen, (220, 100, 100), fill_rect, border_radius=4)
-            pygame.draw.rect(self.screen, (255, 200, 200), bar_rect, 2, border_radius=4)
-
-        if level.boss:
-            health_text = self.font.render(f"Boss HP: {level.boss.health}", True, (255, 160, 200))
-            self.screen.blit(health_text, (WIDTH - 220, 20))
-        if self.player_dancing:
-            dance_text = self.font.render("Celebration: dancing!", True, (255, 210, 120))
-            self.screen.blit(dance_text, (WIDTH - 260, 50))
-        if self.wave_spawned and not self.epilogue_ready:
-            wave_text = self.font.render("Defeat the encore attackers!", True, (255, 200, 200))
-            self.screen.blit(wave_text, (WIDTH - 330, 80))
-        if self.epilogue_ready:
-            soon = self.font.render("Teleporter open: head to Level 11 (Chapter 2)", True, (200, 255, 200))
-            self.screen.blit(soon, (WIDTH // 2 - soon.get_width() // 2, HEIGHT - 40))
-        if self.level_index == len(self.levels) - 1 and self.story_start_time is not None:
-            elapsed = pygame.time.get_ticks() - self.story_start_time
-            if elapsed < 7000:
-                chapter = self.font.render("Chapter 2: Inferno Rising", True, (255, 200, 160))
-                line = self.font.render("The ashlands ignite. Survive the onslaught.", True, (230, 210, 200))
-                self.screen.blit(chapter, (WIDTH // 2 - chapter.get_width() // 2, 90))
-                self.screen.blit(line, (WIDTH // 2 - line.get_width() // 2, 120))
-        if self.god_mode:
-            gm = self.font.render("GOD MODE ENABLED", True, (255, 230, 140))
-            self.screen.blit(gm, (WIDTH - gm.get_width() - 20, HEIGHT - 40))
+                fill_rect = Rect(bar_rect.x, bar_rect.y, int(bar_rect.width * fill_ratio), bar_rect.height)
+                pygame.draw.rect(health_bar, (220, 100, 100), fill_rect, border_radius=4)
+            pygame.draw.rect(health_bar, (255, 200, 200), bar_rect, 2, border_radius=4)
+        items.append((health_bar, (20, 122)))
+
+        if boss_health is not None:
+            items.append((self.render_text(self.font, f"Boss HP: {boss_health}", (255, 160, 200)), (WIDTH - 220, 20)))
+        if dancing:
+            items.append((self.render_text(self.font, "Celebration: dancing!", (255, 210, 120)), (WIDTH - 260, 50)))
+        if wave_active:
+            items.append((self.render_text(self.font, "Defeat the encore attackers!", (255, 200, 200)), (WIDTH - 330, 80)))
+        if epilogue_ready:
+            soon = self.render_text(self.font, "Teleporter open: head to Level 11 (Chapter 2)", (200, 255, 200))
+            items.append((soon, (WIDTH // 2 - soon.get_width() // 2, HEIGHT - 40)))
+        if story:
+            chapter = self.render_text(self.font, "Chapter 2: Inferno Rising", (255, 200, 160))
+            line = self.render_text(self.font, "The ashlands ignite. Survive the onslaught.", (230, 210, 200))
+            items.append((chapter, (WIDTH // 2 - chapter.get_width() // 2, 90)))
+            items.append((line, (WIDTH // 2 - line.get_width() // 2, 120)))
+        if god_mode:
+            gm = self.render_text(self.font, "GOD MODE ENABLED", (255, 230, 140))
+            items.append((gm, (WIDTH - gm.get_width() - 20, HEIGHT - 40)))
+        return items
 
     def run(self):
+        prof = profiler
+        first_frame = True
         while True:
-            self.clock.tick(FPS)
-            if self.state == "menu":
-                self.handle_menu_events()
-                self.draw_background()
-                self.draw_menu()
-            elif self.state == "owner_menu":
-                self.handle_owner_menu_events()
-                self.draw_background()
-                self.draw_owner_menu()
-            elif self.state == "level_select":
-                self.handle_level_select_events()
-                self.draw_background()
-                self.draw_level_select()
-            else:
-                self.handle_events()
-                level = self.levels[self.level_index]
-                self.update_player_state(level)
-
-                self.draw_background()
-                self.draw_level(level)
-                self.draw_hud(level)
-
-            pygame.display.flip()
+            with prof.section("tick"):
+                elapsed = self.clock.tick(self.render_fps)
+            if self.pending_sounds is not None:
+                self.collect_sounds()
+            self.music.poll()
+            with prof.section("frame"):
+                dirty = None
+                if self.state in ("menu", "owner_menu", "level_select"):
+                    state = self.state
+                    with prof.section("events"):
+                        if state == "menu":
+                            self.handle_menu_events()
+                        elif state == "owner_menu":
+                            self.handle_owner_menu_events()
+                        else:
+                            self.handle_level_select_events()
+                    with prof.section("draw.menu"):
+                        dirty = self.draw_menu_screen(state)
+                else:
+                    # The screen no longer holds a menu frame to patch.
+                    self.menu_page_key = None
+                    with prof.section("events"):
+                        self.handle_events()
+                    with prof.section("update"):
+                        self.advance_fixed_ticks(elapsed)
+                    if self.sfx:
+                        self.sfx.flush()
+                    level = self.levels[self.level_index]
+
+                    with prof.section("draw.background"):
+                        self.draw_background()
+                    with prof.section("draw.level"):
+                        self.draw_level(level)
+                    with prof.section("draw.hud"):
+                        self.draw_hud(level)
+
+            if self.show_profiler:
+                self.draw_profiler_overlay()
+            with prof.section("present"):
+                if dirty is None:
+                    pygame.display.flip()
+                else:
+                    pygame.display.update(dirty)
+            if first_frame:
+                first_frame = False
+                startup_trace.mark("first frame")
+            prof.end_frame()
+
+    def set_profiler_overlay(self, visible):
+        self.show_profiler = visible
+        self.profiler_overlay = None
+        profiler.enabled = visible or self.profile_path is not None
+        if visible:
+            profiler.reset()
+
+    def draw_profiler_overlay(self):
+        """Draw the slowest sections (mean/p95/p99 ms) and per-frame counters in a corner panel."""
+        self.profiler_overlay_age += 1
+        if self.profiler_overlay is None or self.profiler_overlay_age >= 30:
+            self.profiler_overlay_age = 0
+            if self.profiler_font is None:
+                self.profiler_font = pygame.font.SysFont("couriernew,dejavusansmono,monospace", 14)
+            rows = profiler.summary()
+            timings = sorted((row for row in rows if row[0] == "time_ms" and row[1] != "tick"), key=lambda row: -row[5])
+            counters = [row for row in rows if row[0] == "count"]
+            lines = [f"{'section':<22}{'mean':>7}{'p95':>7}{'p99':>7}"]
+            lines += [f"{row[1][:22]:<22}{row[3]:7.2f}{row[5]:7.2f}{row[6]:7.2f}" for row in timings[:14]]
+            lines += [f"{row[1][:22]:<22}{row[3]:7.0f}{row[5]:7.0f}{row[6]:7.0f}" for row in counters]
+            line_height = self.profiler_font.get_linesize()
+            panel = Surface((380, line_height * len(lines) + 12), pygame.SRCALPHA)
+            panel.fill((0, 0, 0, 170))
+            for i, text in enumerate(lines):
+                panel.blit(self.profiler_font.render(text, True, (200, 255, 200)), (6, 6 + i * line_height))
+            self.profiler_overlay = panel
+        self.screen.blit(self.profiler_overlay, (WIDTH - self.profiler_overlay.get_width() - 10, 150))
 
     def handle_menu_events(self):
         for event in pygame.event.get():
@@ -1411,15 +3331,68 @@ class Game:
                     pygame.quit()
                     sys.exit()
 
-    def draw_menu(self):
-        title = self.big_font.render("Python Platformer", True, (245, 245, 255))
-        subtitle = self.font.render("11 handcrafted levels | Shields, lasers, boss fight", True, (210, 220, 240))
-        prompt = self.font.render("Press ENTER to play, L to choose a level, ESC to quit", True, (200, 255, 200))
-        owner_prompt = self.font.render("Press O for owner tools (testing)", True, (255, 200, 200))
-        self.screen.blit(title, title.get_rect(center=(WIDTH // 2, HEIGHT // 3)))
-        self.screen.blit(subtitle, subtitle.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 50)))
-        self.screen.blit(prompt, prompt.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 100)))
-        self.screen.blit(owner_prompt, owner_prompt.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 140)))
+    def menu_page(self):
+        title = self.render_text(self.big_font, "Python Platformer", (245, 245, 255))
+        subtitle = self.render_text(self.font, "11 handcrafted levels | Shields, lasers, boss fight", (210, 220, 240))
+        prompt = self.render_text(self.font, "Press ENTER to play, L to choose a level, ESC to quit", (200, 255, 200))
+        owner_prompt = self.render_text(self.font, "Press O for owner tools (testing)", (255, 200, 200))
+        return [
+            (title, title.get_rect(center=(WIDTH // 2, HEIGHT // 3))),
+            (subtitle, subtitle.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 50))),
+            (prompt, prompt.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 100))),
+            (owner_prompt, owner_prompt.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 140))),
+        ]
+
+    def draw_menu_screen(self, state):
+        """Draw a menu screen and return the rects that changed, or None when the whole screen did."""
+        key = (state, self.god_mode, self.op_projectiles, self.show_profiler, self.selected_level)
+        if key != self.menu_page_key:
+            pages = {"menu": self.menu_page, "owner_menu": self.owner_menu_page, "level_select": self.level_select_page}
+            self.menu_items = pages[state]()
+            self.menu_page_key = key
+            self.menu_backdrop_tick = None
+        if self.fire_mode or self.show_profiler:
+            # Embers and the profiler overlay change everywhere every frame.
+            self.draw_background()
+            self.blit_many(self.menu_items)
+            return None
+
+        backdrop_tick = self.render_ticks() // MENU_BACKDROP_MS
+        if backdrop_tick != self.menu_backdrop_tick:
+            self.menu_backdrop_tick = backdrop_tick
+            if self.menu_backdrop is None:
+                self.menu_backdrop = Surface((WIDTH, HEIGHT)).convert()
+                self.menu_hills = Surface((WIDTH, HEIGHT), pygame.SRCALPHA).convert_alpha()
+                self.draw_parallax(self.menu_hills)
+                profiler.count("surface_allocs", 2)
+            self.menu_backdrop.blit(get_gradient_surface((15, 18, 45), (35, 45, 80), (WIDTH, HEIGHT)), (0, 0))
+            self.draw_nebulae(self.menu_backdrop)
+            self.blit(self.menu_backdrop, (0, 0))
+            stars, color = self.step_stars()
+            for center, radius in stars:
+                pygame.draw.circle(self.screen, color, center, radius)
+            self.blit(self.menu_hills, (0, 0))
+            self.blit_many(self.menu_items)
+            self.menu_star_rects = [Rect(x - r - 1, y - r - 1, r * 2 + 2, r * 2 + 2) for (x, y), r in stars]
+            return None
+
+        stars, color = self.step_stars()
+        star_rects = [Rect(x - r - 1, y - r - 1, r * 2 + 2, r * 2 + 2) for (x, y), r in stars]
+        # Disjoint areas, so the translucent page text is never blended twice.
+        dirty = merge_rects([old.union(new) for old, new in zip(self.menu_star_rects, star_rects)])
+        self.menu_star_rects = star_rects
+        backdrop = self.menu_backdrop
+        blits = [(backdrop, area.topleft, area) for area in dirty]
+        self.blit_many(blits)
+        for center, radius in stars:
+            pygame.draw.circle(self.screen, color, center, radius)
+        blits = []
+        for surface, rect in [(self.menu_hills, self.menu_hills.get_rect()), *self.menu_items]:
+            for index in rect.collidelistall(dirty):
+                clip = dirty[index].clip(rect)
+                blits.append((surface, clip.topleft, clip.move(-rect.x, -rect.y)))
+        self.blit_many(blits)
+        return dirty
 
     def handle_owner_menu_events(self):
         for event in pygame.event.get():
@@ -1433,26 +3406,34 @@ class Game:
                 elif event.key == pygame.K_2:
                     self.op_projectiles = not self.op_projectiles
                     self.player.op_projectiles = self.op_projectiles
+                elif event.key == pygame.K_3:
+                    self.set_profiler_overlay(not self.show_profiler)
                 elif event.key in (pygame.K_ESCAPE, pygame.K_BACKSPACE):
                     self.state = "menu"
                 elif event.key in (pygame.K_RETURN, pygame.K_SPACE):
                     self.state = "menu"
 
-    def draw_owner_menu(self):
-        title = self.big_font.render("Owner Menu", True, (255, 220, 220))
-        hint = self.font.render("Testing utilities (not for players)", True, (230, 200, 200))
+    def owner_menu_page(self):
+        title = self.render_text(self.big_font, "Owner Menu", (255, 220, 220))
+        hint = self.render_text(self.font, "Testing utilities (not for players)", (230, 200, 200))
         god_status = "ON" if self.god_mode else "OFF"
         god_color = (170, 255, 170) if self.god_mode else (255, 180, 180)
-        option = self.font.render(f"1) God Mode: {god_status}", True, god_color)
+        option = self.render_text(self.font, f"1) God Mode: {god_status}", god_color)
         op_status = "ON" if self.op_projectiles else "OFF"
         op_color = (170, 255, 220) if self.op_projectiles else (255, 200, 200)
-        option2 = self.font.render(f"2) OP Projectiles: {op_status}", True, op_color)
-        close = self.font.render("ENTER/ESC to return", True, (210, 220, 240))
-        self.screen.blit(title, title.get_rect(center=(WIDTH // 2, HEIGHT // 3)))
-        self.screen.blit(hint, hint.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 40)))
-        self.screen.blit(option, option.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 90)))
-        self.screen.blit(option2, option2.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 130)))
-        self.screen.blit(close, close.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 180)))
+        option2 = self.render_text(self.font, f"2) OP Projectiles: {op_status}", op_color)
+        profiler_status = "ON" if self.show_profiler else "OFF"
+        profiler_color = (170, 220, 255) if self.show_profiler else (255, 200, 200)
+        option3 = self.render_text(self.font, f"3) Profiler Overlay: {profiler_status}", profiler_color)
+        close = self.render_text(self.font, "ENTER/ESC to return", (210, 220, 240))
+        return [
+            (title, title.get_rect(center=(WIDTH // 2, HEIGHT // 3))),
+            (hint, hint.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 40))),
+            (option, option.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 90))),
+            (option2, option2.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 130))),
+            (option3, option3.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 170))),
+            (close, close.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 220))),
+        ]
 
     def handle_level_select_events(self):
         for event in pygame.event.get():
@@ -1479,9 +3460,23 @@ class Game:
                 elif event.key == pygame.K_ESCAPE:
                     self.state = "menu"
 
-    def draw_level_select(self):
-        title = self.big_font.render("Select a level", True, (240, 255, 240))
-        self.screen.blit(title, title.get_rect(center=(WIDTH // 2, 70)))
+    def level_box(self, label, color):
+        """Level-select tile for label in the given highlight colour, cached across redraws."""
+        key = (label, color)
+        box = self.level_boxes.get(key)
+        if box is None:
+            box = pygame.Surface((150, 60), pygame.SRCALPHA)
+            profiler.count("surface_allocs")
+            pygame.draw.rect(box, (40, 60, 90, 180), box.get_rect(), border_radius=12)
+            pygame.draw.rect(box, (color[0], color[1], color[2], 200), box.get_rect(), 3, border_radius=12)
+            text = self.render_text(self.font, label, color)
+            box.blit(text, text.get_rect(center=(75, 30)))
+            self.level_boxes[key] = box
+        return box
+
+    def level_select_page(self):
+        title = self.render_text(self.big_font, "Select a level", (240, 255, 240))
+        page = [(title, title.get_rect(center=(WIDTH // 2, 70)))]
         grid_cols = 5
         spacing_x = WIDTH // (grid_cols + 1)
         spacing_y = 100
@@ -1492,21 +3487,111 @@ class Game:
             pos = (spacing_x + col * spacing_x, start_y + row * spacing_y)
             label = f"Level {idx + 1}"
             color = (120, 255, 170) if idx == self.selected_level else (210, 220, 230)
-            box = pygame.Surface((150, 60), pygame.SRCALPHA)
-            pygame.draw.rect(box, (40, 60, 90, 180), box.get_rect(), border_radius=12)
-            pygame.draw.rect(box, (color[0], color[1], color[2], 200), box.get_rect(), 3, border_radius=12)
-            text = self.font.render(label, True, color)
-            box.blit(text, text.get_rect(center=(75, 30)))
-            self.screen.blit(box, box.get_rect(center=pos))
+            box = self.level_box(label, color)
+            page.append((box, box.get_rect(center=pos)))
 
-        hint = self.font.render("Use arrows/wasd or 1-0 keys (- for 11). Enter to load.", True, (200, 220, 240))
-        self.screen.blit(hint, hint.get_rect(center=(WIDTH // 2, HEIGHT - 60)))
+        hint = self.render_text(self.font, "Use arrows/wasd or 1-0 keys (- for 11). Enter to load.", (200, 220, 240))
+        page.append((hint, hint.get_rect(center=(WIDTH // 2, HEIGHT - 60))))
+        return page
 
     def start_level(self, index):
         self.level_index = max(0, min(index, len(self.levels) - 1))
         self.reset_level_state()
         self.state = "playing"
 
+    def capture_positions(self, level):
+        """Record where moving sprites (and the camera) are before a tick, for interpolated drawing."""
+        previous = self.previous_positions
+        previous.clear()
+        self.camera.mark()
+        movers = [self.player, *self.wave_enemies]
+        if level.boss:
+            movers.append(level.boss)
+        for group in (level.moving_platforms, level.enemies, level.hover_enemies, level.flame_enemies):
+            movers.extend(level.in_rect(group, self.camera.active))
+        for sprite in movers:
+            previous[sprite] = sprite.rect.topleft
+
+    def advance_fixed_ticks(self, elapsed):
+        """Run the fixed ticks `elapsed` milliseconds cover, at most MAX_CATCH_UP_TICKS, then set the blend factor."""
+        self.accumulator += min(elapsed, MAX_FRAME_MS)
+        ticks = 0
+        while self.accumulator >= TICK_MS and ticks < MAX_CATCH_UP_TICKS:
+            level = self.levels[self.level_index]
+            self.capture_positions(level)
+            self.update_player_state(level)
+            self.sim_frames += 1
+            self.accumulator -= TICK_MS
+            ticks += 1
+        self.accumulator %= TICK_MS
+        self.render_alpha = self.accumulator / TICK_MS
+
+    def step_simulation(self):
+        """Advance game logic by one frame without events, drawing or frame limiting."""
+        with profiler.section("update"):
+            self.update_player_state(self.levels[self.level_index])
+        self.sim_frames += 1
+        profiler.end_frame()
+
+    def simulate(self, frames, level_index=None, input_source=None):
+        """Run `frames` logic steps as fast as possible and return the elapsed seconds."""
+        if input_source is not None:
+            self.input_source = input_source
+        if level_index is not None:
+            self.start_level(level_index)
+        start = time.perf_counter()
+        for _ in range(frames):
+            self.step_simulation()
+        return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Python Platformer - 11 Levels")
+    parser.add_argument(
+        "--headless", action="store_true", help="simulate game logic without a window, audio or frame limiting"
+    )
+    parser.add_argument("--frames", type=int, default=3600, help="frames to simulate in headless mode")
+    parser.add_argument("--level", type=int, default=1, help="level (1-11) to simulate in headless mode")
+    parser.add_argument("--replay", help="file of per-frame input bitmasks to drive a headless run")
+    parser.add_argument("--record", metavar="PATH", help="write the per-frame inputs of a live game to PATH on exit, for --replay")
+    parser.add_argument("--seed", type=int, help="seed for reproducible enemy, laser and boss randomness")
+    parser.add_argument("--profile", metavar="PATH", help="record frame timings and write them to PATH (.json or .csv) on exit")
+    parser.add_argument(
+        "--fps",
+        type=int,
+        default=FPS,
+        help=f"render frame cap; the simulation always ticks at {FPS} Hz (0 = uncapped, default {FPS})",
+    )
+    parser.add_argument("--levels", metavar="DIR", help="load compiled .lvl levels from DIR instead of the built-in maps")
+    parser.add_argument("--compile-levels", metavar="DIR", help="compile the built-in text maps into DIR and exit")
+    parser.add_argument("--startup-trace", action="store_true", help="print the time spent in each startup phase")
+    args = parser.parse_args(argv)
+    startup_trace.enabled = args.startup_trace
+
+    if args.compile_levels:
+        for path in compile_levels(args.compile_levels):
+            print(f"Wrote {path}")
+        return
+    layouts = load_compiled_levels(args.levels) if args.levels else None
+    if args.levels and not layouts:
+        parser.error(f"no .lvl files found in {args.levels}")
+    if args.record and args.headless:
+        parser.error("--record captures live play; it cannot be combined with --headless")
+
+    if args.headless:
+        game = Game(headless=True, seed=args.seed, profile_path=args.profile, layouts=layouts)
+        input_source = FrameMaskInput.load(args.replay) if args.replay else None
+        elapsed = game.simulate(args.frames, args.level - 1, input_source)
+        fps = args.frames / elapsed if elapsed > 0 else float("inf")
+        print(f"Simulated {args.frames} frames of level {args.level} in {elapsed:.3f}s ({fps:.0f} frames/s)")
+        print(f"Seed {game.seed}, final state {game.state_digest()}")
+        return
+    game = Game(seed=args.seed, profile_path=args.profile, layouts=layouts, render_fps=args.fps)
+    if args.record:
+        recorder = game.input_source = RecordingInput(game.input_source)
+        atexit.register(recorder.save, args.record)
+    game.run()
+
 
 if __name__ == "__main__":
-    Game().run()
+    main()